@@ -1,19 +1,56 @@
 import MMsuit.MMcalc as mm
-from dash import dash, dcc, html, Output, Input, State
-import pandas as pd
-import numpy as np
-import base64
-import io
+import MMsuit.MMio as mmio
+import MMsuit.MMjobs as mmjobs
+import MMsuit.MMsession as mmsession
+from dash import dash, dcc, html, Output, Input, State, no_update
+from dash.exceptions import PreventUpdate
 import plotly.graph_objects as go
+import contextlib
+import logging
+import os
+import uuid
 
-#Intialize data storage variable
-uploaded = None
+#Background jobs: with MMSUIT_JOBS=<n> (and the diskcache extra installed) fits run in separate processes, at most
+#n at a time, with progress and cancellation; otherwise callbacks run synchronously in the request thread.
+#New fits are refused before their process starts once n running plus MMSUIT_JOBS_QUEUE (default n) waiting jobs exist
+background_manager, job_slots = mmjobs.MMjobs()
+job_queue = int(os.environ.get('MMSUIT_JOBS_QUEUE') or (job_slots.size if job_slots is not None else 0))
+
+#Intialize server-side session store, uploads are kept there and callbacks only exchange the session id
+#(MMSUIT_STORE=sqlite:<path> shares sessions between worker processes, and is the default for background jobs)
+session_store = mmsession.MMstore(None if background_manager is None else os.environ.get('MMSUIT_STORE', 'sqlite'))
+
+#Instrumentation: with MMSUIT_PROFILE=1 (or MMgui(profile=True)) every callback logs its per-stage timings,
+#optimizer counts and convergence status as structured records on the 'MMsuit' logger (see MMcalc.MMprofile)
+profile = False
+
+def _profiled():
+    return mm.MMprofile(log=True) if profile else contextlib.nullcontext()
+
+def set_profile(enabled: bool):
+    '''
+    Turns per-callback profiling logs on or off. Enabling lowers the 'MMsuit' logger to INFO if needed and, when
+    logging is not configured, prints the records to stderr.
+    '''
+    global profile
+    profile = bool(enabled)
+    if profile:
+        logger = logging.getLogger('MMsuit')
+        if logger.getEffectiveLevel() > logging.INFO:
+            logger.setLevel(logging.INFO)
+        if not logger.hasHandlers():
+            logger.addHandler(logging.StreamHandler())
+
+set_profile(os.environ.get('MMSUIT_PROFILE'))
 
 #Initialize Dash
 app = dash.Dash(__name__, suppress_callback_exceptions=True)
+server = app.server  # WSGI entry point, e.g. gunicorn -w 4 MMsuit.MMapp:server
 
-#Dash Layout
-app.layout = html.Div([html.H1(children='MMsuit: Michaelis-Menten Suit', style={"textAlign": "center", "marginBottom": "20px"}),
+#Dash Layout, served per page load so every browser session gets its own id
+def serve_layout():
+    return html.Div([dcc.Store(id='session-id', data=uuid.uuid4().hex),
+                       html.H1(children='MMsuit: Michaelis-Menten Suit', style={"textAlign": "center", "marginBottom": "20px"}),
                        html.Div([dcc.Tabs(id="tabs", value='tab-1', children=[dcc.Tab(label='ExperimentExecuter', value='tab-1'),
                                                                                dcc.Tab(label='Simulator', value='tab-2'),])]),
                        html.Div(id='tabs-content')],
@@ -22,15 +59,21 @@ app.layout = html.Div([html.H1(children='MMsuit: Michaelis-Menten Suit', style={
                              "backgroundColor": "#4B2E83",  # UW Huskies Purple background
                              "color": "#D4AF37",  # Gold text color
                              "fontFamily": "Arial, sans-serif"})
+app.layout = serve_layout
 # Callback function to switch content based on the selected tab
 @app.callback(Output('tabs-content', 'children'),
               Input('tabs', 'value'))
 def render_content(tab):
     if tab == 'tab-1':
-        return html.Div([html.H3(children='Upload your data as Substrate in one column and Velocity in the other column\nMMsuit fits your data to Michaelis-Menten and LineWeaver-Burk equations'),
+        return html.Div([html.H3(children='Upload your data as Substrate in the first column and Velocity in the other column(s)\nMMsuit fits your data to Michaelis-Menten and LineWeaver-Burk equations'),
                        dcc.Upload(id = 'upload-input',
                                   children= html.Button('Upload'), multiple=False),
                        html.Div(id='upload-output', style={"marginTop": "10px", "color": "#D4AF37"}),
+                       ## Curve selection for files with several velocity columns
+                       html.Div([html.Label("Curve:"),
+                                 dcc.Dropdown(id='curve-select', options=[], value=None, clearable=False,
+                                              style={"width": "200px", "color": "black"})],
+                                style={"marginTop": "10px"}),
                        html.Div([
                            ## Michaelis-Menten plot
                            html.Div([dcc.Markdown('''
@@ -60,6 +103,13 @@ def render_content(tab):
                                         ],
                            style={"marginBottom": "20px", "color": "#D4AF37", "textAlign": "center"},
                        ),
+                       ## Progress and cancellation of background fits
+                       html.Div([dcc.Store(id='fit-request'),
+                                 html.Span(id='fit-status', style={"marginRight": "10px"}),
+                                 html.Span(id='fit-progress', style={"marginRight": "10px"}),
+                                 html.Button('Cancel fit', id='cancel-fit', disabled=True)],
+                                style={"marginBottom": "20px", "textAlign": "center",
+                                       "display": "block" if background_manager is not None else "none"}),
 
                        ## (Optional) Display Kcat
                        html.Div([
@@ -67,6 +117,8 @@ def render_content(tab):
                            dcc.Input(id='enzyme-conc', type='number', min=0, step=0.1, placeholder="Enter value"),
                            html.Button('Compute kcat', id='compute-kcat', n_clicks=0, style={'margin-left': '10px'}),
                            html.Div(id='kcat-output', style={'margin-top': '10px', 'font-weight': 'bold'}),
+                           ## Fitted parameters of the selected curve, read by the clientside kcat callback
+                           dcc.Store(id='fit-params'),
                        ])])
     ## Michaelis-Menten Simulator
     elif tab == 'tab-2':
@@ -80,6 +132,14 @@ def render_content(tab):
                                html.Button("Michaelis-Menten Simulator", id="button-michaelis-menten",n_clicks=0,
                                    style={"marginLeft": "12px"}
                                    ),
+                           ## Live parameter sweeps (log10 scale), drawn in the browser
+                               html.Div([html.Label("Sweep Km:"),
+                                         dcc.Slider(id="slider-km", min=-3, max=3, step=0.01, value=1,
+                                                    marks={i: f'{10**i:g}' for i in range(-3, 4)}, updatemode='drag'),
+                                         html.Label("Sweep Vmax:"),
+                                         dcc.Slider(id="slider-vmax", min=-3, max=3, step=0.01, value=1,
+                                                    marks={i: f'{10**i:g}' for i in range(-3, 4)}, updatemode='drag')],
+                                        style={"marginTop": "12px"}),
                          html.Div([
                            ## Michaelis-Menten simulated plot
                                html.Div(dcc.Graph(id="simulatedMM-plot"),style={"width": "48%","display": "inline-block"}),
@@ -90,59 +150,179 @@ def render_content(tab):
 
 #Dash Callbacks
 @app.callback([Output('upload-output', 'children'),
-              Output('MM-plot', 'figure'),
-                Output('LB-plot', 'figure'),
-               Output('vmax-box','value'),
-               Output('km-box','value'),
-               Output('kcat-output', 'children')],
-              [Input('upload-input', 'contents'),
-              Input('compute-kcat', 'n_clicks')],
+               Output('curve-select', 'options'),
+               Output('curve-select', 'value')],
+              Input('upload-input', 'contents'),
               [State('upload-input', 'filename'),
-               State('enzyme-conc', 'value')])
-def update_output(contents,n_clicks,filename,enzyme_conc):
-    global uploaded
+               State('session-id', 'data')])
+def update_upload(contents,filename,session_id):
     if contents is not None:
-        content_type, content_string = contents.split(',')
-        decoded = base64.b64decode(content_string)
-        try:
-            df = pd.read_csv(io.StringIO(decoded.decode('utf-8')))
-            uploaded = np.transpose(df.to_numpy())
-            uploaded = (uploaded[0],uploaded[1])
-            if df.shape[1] >= 2:
-                MMfig = mm.MMplot(uploaded)
-                LBfig = mm.LBplot(uploaded)
-                fittedMMparams = mm.MMfitter(uploaded)
-                Vmax = fittedMMparams[1][1]
-                Km = fittedMMparams[1][0]
-            else:
-                fig = go.Figure()
-                fig.add_annotation(text="Insufficient Data for Plotting",
-                                   xref="paper", yref="paper",
-                                   showarrow=False,
-                                   font=dict(size=16, color="red"))
-            kcat_output = "Enter enzyme concentration to compute kcat."
-            if n_clicks > 0 and enzyme_conc is not None and enzyme_conc > 0:
-                kcat = Vmax / (enzyme_conc * 1e-6)  # Convert enzyme concentration to M
-                kcat_output = f"kcat: {kcat:.2f} s⁻¹"
-            return f'Yay! {filename} uploaded successfully!', MMfig, LBfig, f'{Vmax:.2f}', f'{Km:.2f}',kcat_output
-        except:
-            return 'Error reading file',go.Figure(),go.Figure(),'N/A','N/A','Upload data to compute Kcat'
-    return 'Please upload a file', go.Figure(),go.Figure(),'N/A','N/A','Upload data to compute Kcat'
-
-@app.callback(
+        with _profiled():
+            try:
+                # Parse once per upload and keep the columns server-side for this session
+                t0 = mm.MMprofile.start()
+                S, curves = mmio.MMread(mmio.MMdecode(contents), filename)
+                mm.MMprofile.emit('MMapp.parse', t0, n_points=len(S), n_curves=len(curves))
+                session_store.set(session_id, (S, curves))
+                return f'Yay! {filename} uploaded successfully!', list(curves), next(iter(curves))
+            except:
+                session_store.delete(session_id)
+                return 'Error reading file',[],None
+    return 'Please upload a file',[],None
+
+def shared_fit(eSV):
+    '''
+    MMfit for the GUI. Its LRU is per process, so background jobs, each in a fresh process, also look the result up
+    in the job cache shared by all workers before fitting.
+
+    Inputs: eSV: (S, V) of the selected curve
+    :return: MMresult
+    '''
+    if job_slots is None:
+        return mm.MMfit(eSV) # Cached, so re-renders do not refit
+    key = 'mmsuit-fit-' + mm.MMfit.key(eSV)
+    fit = job_slots.cache.get(key)
+    if fit is None:
+        fit = mm.MMfit(eSV)
+        job_slots.cache.set(key, fit, expire=3600)
+    return fit
+
+def fit_outputs(curve, session_id, set_progress=None):
+    '''
+    Fits and plots the selected curve of a session, the work behind update_output.
+
+    Inputs: curve: velocity column name, session_id: session store key, set_progress: optional progress callback
+    :return: MM figure, LB figure, Vmax and Km texts and the fit-params data
+    '''
+    uploaded = session_store.get(session_id)
+    if uploaded is not None and curve in uploaded[1]:
+        with _profiled():
+            try:
+                t0 = mm.MMprofile.start()
+                S, curves = uploaded
+                if set_progress is not None:
+                    set_progress(f'Fitting {curve}...')
+                fit = shared_fit((S, curves[curve]))
+                if set_progress is not None:
+                    set_progress(f'Plotting {curve}...')
+                MMfig = mm.MMplot((S, curves[curve]), fit)
+                LBfig = mm.LBplot((S, curves[curve]), fit)
+                Vmax = fit.Vmax
+                Km = fit.Km
+                mm.MMprofile.emit('MMapp.update_output', t0, curve=curve)
+                return MMfig, LBfig, f'{Vmax:.2f}', f'{Km:.2f}', {'Km': Km, 'Vmax': Vmax}
+            except:
+                return go.Figure(),go.Figure(),'N/A','N/A',None
+    return go.Figure(),go.Figure(),'N/A','N/A',None
+
+_fit_outputs = [Output('MM-plot', 'figure'),
+                Output('LB-plot', 'figure'),
+                Output('vmax-box','value'),
+                Output('km-box','value'),
+                Output('fit-params', 'data')]
+if background_manager is None:
+    @app.callback(_fit_outputs,
+                  Input('curve-select', 'value'),
+                  State('session-id', 'data'))
+    def update_output(curve,session_id):
+        return fit_outputs(curve, session_id)
+else:
+    # Admission runs synchronously in the request thread, so a refused fit never starts a job process.
+    # Neither callback fires on the initial render, and nothing is requested until a curve is selected.
+    @app.callback([Output('fit-request', 'data'),
+                   Output('fit-status', 'children')],
+                  Input('curve-select', 'value'),
+                  State('session-id', 'data'),
+                  prevent_initial_call=True)
+    def request_fit(curve,session_id):
+        if curve is None:
+            raise PreventUpdate
+        if not job_slots.admit(job_queue):
+            return no_update, 'The server is busy, select the curve again in a moment.'
+        return {'curve': curve, 'session': session_id}, ''
+
+    # Runs in its own process; the request thread only starts the job and polls for progress and the result
+    @app.callback(_fit_outputs,
+                  Input('fit-request', 'data'),
+                  background=True, manager=background_manager,
+                  progress=Output('fit-progress', 'children'),
+                  running=[(Output('cancel-fit', 'disabled'), False, True),
+                           (Output('fit-progress', 'children'), 'Starting...', '')],
+                  cancel=Input('cancel-fit', 'n_clicks'),
+                  prevent_initial_call=True)
+    def update_output(set_progress,request):
+        with job_slots.acquire(on_wait=lambda: set_progress('Waiting for a free worker...')):
+            return fit_outputs(request['curve'], request['session'], set_progress)
+
+# kcat only divides the stored Vmax by the enzyme concentration, so it runs in the browser (mirrors MMcalc.kcat)
+app.clientside_callback(
+    """
+    function(n_clicks, params, enzyme_conc) {
+        if (!params) {
+            return 'Upload data to compute Kcat';
+        }
+        if (n_clicks > 0 && enzyme_conc !== null && enzyme_conc !== undefined && enzyme_conc > 0) {
+            const kcat = params.Vmax / (enzyme_conc * 1e-6);  // Convert enzyme concentration to M
+            return 'kcat: ' + kcat.toFixed(2) + ' s⁻¹';
+        }
+        return 'Enter enzyme concentration to compute kcat.';
+    }
+    """,
+    Output('kcat-output', 'children'),
+    [Input('compute-kcat', 'n_clicks'),
+     Input('fit-params', 'data')],
+    State('enzyme-conc', 'value'))
+
+# Simulated curves are computed in the browser: the normalized curve u/(1+u), u = S/Km on the MMsimulator grid
+# (100 points from 0.1 Km to 10 Km), scaled by Km and Vmax. The button uses the typed values, the sliders sweep live.
+app.clientside_callback(
+    """
+    function(n_clicks, slider_km, slider_vmax, km, vmax) {
+        const triggered = dash_clientside.callback_context.triggered.map(t => t.prop_id);
+        if (triggered.includes('button-michaelis-menten.n_clicks')) {
+            if (km === null || km === undefined || vmax === null || vmax === undefined || km <= 0 || vmax <= 0) {
+                return [dash_clientside.no_update, dash_clientside.no_update];
+            }
+        } else {
+            km = Math.pow(10, slider_km);
+            vmax = Math.pow(10, slider_vmax);
+        }
+        const x = [], y = [], LBx = [], LBy = [];
+        for (let i = 0; i < 100; i++) {
+            const u = 0.1 + i * (10 - 0.1) / 99;
+            x.push(km * u);
+            y.push(vmax * u / (1 + u));
+            LBx.push(1 / (km * u));
+            LBy.push((1 + u) / (vmax * u));
+        }
+        const figure = (xs, ys, title, xtitle, ytitle) => ({
+            data: [{x: xs, y: ys, type: 'scatter', mode: 'lines', name: 'Simulated'}],
+            layout: {title: {text: title}, xaxis: {title: {text: xtitle}}, yaxis: {title: {text: ytitle}}}
+        });
+        return [figure(x, y, 'Michaelis-Menten Plot', 'Substrate concentration', 'Velocity'),
+                figure(LBx, LBy, 'Lineweaver-Burk Plot', '1/Substrate concentration', '1/Velocity')];
+    }
+    """,
     [Output("simulatedMM-plot", "figure"),Output("simulatedLB-plot", "figure")],
-    Input("button-michaelis-menten", "n_clicks"),
+    [Input("button-michaelis-menten", "n_clicks"),
+     Input("slider-km", "value"),
+     Input("slider-vmax", "value")],
     [State("input-km", "value"), State("input-vmax", "value")]
 )
-def update_simulated(n_clicks, km, vmax):
-    if n_clicks > 0 and km is not None and vmax is not None:
-        simulatedfig = mm.MMsimulator(km, vmax)
-        return [simulatedfig[0],simulatedfig[1]]
-    return [go.Figure(),go.Figure()]
 
 
 #Run Dash
-def MMgui(debug=True, host="127.0.0.1", port=8050):
+def MMgui(debug=True, host="127.0.0.1", port=8050, store=None, profile=None):
+    '''
+    Runs the GUI. store: optional session store backend name ('memory', 'sqlite:<path>') or store object,
+    defaults to the MMSUIT_STORE environment variable. profile: log per-stage timings of every callback,
+    defaults to the MMSUIT_PROFILE environment variable.
+    '''
+    global session_store
+    if store is not None:
+        session_store = mmsession.MMstore(store) if isinstance(store, str) else store
+    if profile is not None:
+        set_profile(profile)
     app.run_server(debug=debug, host=host, port=port)
     if __name__ == "__main__":
         MMgui()
@@ -0,0 +1,136 @@
+#Dependencies
+
+#Load Packages
+import numpy as np
+
+# Fixed schema of one fitted curve; covariance is stored as its three distinct terms
+RESULT_DTYPE = np.dtype([('source', np.int64), ('curve', np.int32), ('n', np.int32),
+                         ('Km', np.float64), ('Vmax', np.float64),
+                         ('cov_Km', np.float64), ('cov_KmVmax', np.float64), ('cov_Vmax', np.float64),
+                         ('Km_se', np.float64), ('Vmax_se', np.float64),
+                         ('Km_ci_low', np.float64), ('Km_ci_high', np.float64),
+                         ('Vmax_ci_low', np.float64), ('Vmax_ci_high', np.float64),
+                         ('SSR', np.float64), ('success', np.bool_)])
+
+def MMrecords(popt, pcov, success, SSR, source=0, curve=None, n=None) -> np.ndarray:
+    '''
+    Packs fit results into a structured array of RESULT_DTYPE, one record per curve. Takes the output of
+    MMfitter_batch directly; a single MMfitter result can be passed as popt (2,), pcov (2, 2) and scalars.
+    Standard errors come from the covariance diagonal and 95% intervals are estimate ± 1.96·SE, as in MMcli.
+
+    Inputs:
+    popt: (n_curves, 2) Km, Vmax, pcov: (n_curves, 2, 2) covariance, success, SSR: per curve
+    source: integer source id (scalar or per curve), curve: curve index within the source (default 0, 1, ...),
+    n: number of fitted points per curve (default 0)
+    :return: structured array of RESULT_DTYPE
+    '''
+    popt = np.atleast_2d(np.asarray(popt, dtype=np.float64))
+    pcov = np.asarray(pcov, dtype=np.float64).reshape(-1, 2, 2)
+    records = np.zeros(len(popt), dtype=RESULT_DTYPE)
+    records['source'] = source
+    records['curve'] = np.arange(len(popt)) if curve is None else curve
+    records['n'] = 0 if n is None else n
+    records['Km'], records['Vmax'] = popt[:, 0], popt[:, 1]
+    records['cov_Km'], records['cov_KmVmax'], records['cov_Vmax'] = pcov[:, 0, 0], pcov[:, 0, 1], pcov[:, 1, 1]
+    with np.errstate(invalid='ignore'):
+        Km_se, Vmax_se = np.sqrt(pcov[:, 0, 0]), np.sqrt(pcov[:, 1, 1])
+    records['Km_se'], records['Vmax_se'] = Km_se, Vmax_se
+    records['Km_ci_low'], records['Km_ci_high'] = popt[:, 0] - 1.96*Km_se, popt[:, 0] + 1.96*Km_se
+    records['Vmax_ci_low'], records['Vmax_ci_high'] = popt[:, 1] - 1.96*Vmax_se, popt[:, 1] + 1.96*Vmax_se
+    records['SSR'] = SSR
+    records['success'] = success
+    return records
+
+class MMarchive:
+    '''
+    Array-backed archive of fit results with the fixed RESULT_DTYPE schema. Batches are appended into a buffer that
+    doubles its capacity when full, so appending stays amortized O(1) per record without Python objects per fit.
+    Archives are saved as plain .npy files; MMarchive.load memory-maps them, so opening a multi-GB archive is instant
+    and slicing or filtering only reads the pages it touches.
+    '''
+    def __init__(self, capacity: int = 1024):
+        self._data = np.zeros(max(int(capacity), 1), dtype=RESULT_DTYPE)
+        self._size = 0
+
+    @classmethod
+    def load(cls, path, mmap_mode: str = 'r'):
+        '''
+        Opens an archive saved with save.
+
+        Inputs: path: .npy file, mmap_mode: passed to np.load ('r' read-only, 'r+' in place, None loads into memory)
+        :return: MMarchive backed by the (memory-mapped) file; appending copies it into memory first
+        '''
+        data = np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+        if data.dtype != RESULT_DTYPE:
+            raise ValueError(f"{path} is not an MMarchive file.")
+        archive = cls.__new__(cls)
+        archive._data = data
+        archive._size = len(data)
+        return archive
+
+    @property
+    def records(self) -> np.ndarray:
+        # View of the filled part of the buffer, no copy
+        return self._data[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def append(self, records):
+        '''
+        Appends a structured array of RESULT_DTYPE records (see MMrecords).
+        '''
+        records = np.asarray(records, dtype=RESULT_DTYPE).reshape(-1)
+        end = self._size + len(records)
+        if end > len(self._data) or isinstance(self._data, np.memmap):
+            grown = np.zeros(max(end, 2*len(self._data)), dtype=RESULT_DTYPE)
+            grown[:self._size] = self.records
+            self._data = grown
+        self._data[self._size:end] = records
+        self._size = end
+
+    def append_fits(self, popt, pcov, success, SSR, source=0, curve=None, n=None):
+        '''
+        Appends MMfitter_batch output (or a single MMfitter result); arguments as in MMrecords.
+        '''
+        self.append(MMrecords(popt, pcov, success, SSR, source, curve, n))
+
+    def save(self, path):
+        '''
+        Writes the archive to a .npy file that MMarchive.load can memory-map.
+        '''
+        np.save(path, self.records)
+
+    def iterchunks(self, chunksize: int = 1 << 20):
+        '''
+        Yields consecutive slices of at most chunksize records, to scan a memory-mapped archive in bounded memory.
+        '''
+        for start in range(0, self._size, chunksize):
+            yield self._data[start:min(start + chunksize, self._size)]
+
+    def select(self, source=None, success=None, chunksize: int = 1 << 20, **ranges) -> np.ndarray:
+        '''
+        Filters the archive chunk by chunk, so only matching records are copied into memory.
+
+        Inputs: source: id or list of ids to keep, success: keep only successful (True) or failed (False) fits,
+        ranges: field=(low, high) inclusive bounds, e.g. Km=(10, 50), chunksize: records scanned per step
+        :return: structured array of the matching records
+        '''
+        for field in ranges:
+            if field not in RESULT_DTYPE.names:
+                raise ValueError(f"Unknown field {field!r}.")
+        parts = []
+        for chunk in self.iterchunks(chunksize):
+            keep = np.ones(len(chunk), dtype=bool)
+            if source is not None:
+                keep &= np.isin(chunk['source'], source)
+            if success is not None:
+                keep &= chunk['success'] == success
+            for field, (low, high) in ranges.items():
+                values = chunk[field]
+                keep &= (values >= low) & (values <= high)
+            parts.append(chunk[keep])
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=RESULT_DTYPE)
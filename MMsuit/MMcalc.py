@@ -1,10 +1,84 @@
 #Dependencies
 
 #Load Packages
-from scipy import stats
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import NamedTuple
+import hashlib
+import logging
+import threading
+import time
+import warnings
 from scipy import optimize as op
 import numpy as np
-import plotly.graph_objects as go
+# scipy.stats (slow to import) is loaded in LBfitter and Plotly in the plotting functions,
+# so importing the fitting functions stays cheap
+
+# Instrumentation
+_log = logging.getLogger('MMsuit')
+_observers = ContextVar('MMsuit_observers', default=())
+
+class MMprofile:
+    '''
+    Context manager recording per-stage instrumentation events of the fitting pipeline (MMhandler, outlier filtering,
+    optimizer runs with iteration/evaluation counts and convergence status, figure construction, GUI callbacks).
+    Each event is a dict with 'stage', 'seconds' and stage-specific fields. Recording is per thread/context; when no
+    profile is active a stage does one ContextVar lookup and nothing else, so disabled instrumentation costs nothing.
+
+    Inputs: callback: optional callable receiving every event, log: also emit every event as an INFO record on
+    the 'MMsuit' logger, with the event dict attached as record.mmsuit
+    Usage: with MMprofile() as prof: MMfitter(eSV); then prof.events or prof.summary()
+    '''
+    def __init__(self, callback=None, log: bool = False):
+        self.callback = callback
+        self.log = log
+        self.events = []
+        self._token = None
+
+    def __enter__(self):
+        self._token = _observers.set(_observers.get() + (self._record,))
+        return self
+
+    def __exit__(self, *exc):
+        _observers.reset(self._token)
+        return False
+
+    def _record(self, event: dict):
+        self.events.append(event)
+        if self.callback is not None:
+            self.callback(event)
+        if self.log:
+            _log.info('%s %.6fs', event['stage'], event['seconds'], extra={'mmsuit': event})
+
+    def summary(self) -> dict:
+        '''
+        :return: dict mapping each stage to its number of events and total seconds
+        '''
+        totals = {}
+        for event in self.events:
+            total = totals.setdefault(event['stage'], {'count': 0, 'seconds': 0.0})
+            total['count'] += 1
+            total['seconds'] += event['seconds']
+        return totals
+
+    @staticmethod
+    def start():
+        '''
+        :return: a start time when a profile is active, otherwise None (pass it to MMprofile.emit)
+        '''
+        return time.perf_counter() if _observers.get() else None
+
+    @staticmethod
+    def emit(stage: str, t0, **info):
+        '''
+        Sends an event for stage, timed from t0 = MMprofile.start(), to the active profiles. Does nothing if t0 is None.
+        '''
+        if t0 is None:
+            return
+        event = {'stage': stage, 'seconds': time.perf_counter() - t0, **info}
+        for observer in _observers.get():
+            observer(event)
 
 # Data Handler
 def MMhandler(data):
@@ -14,6 +88,7 @@ def MMhandler(data):
     Input: Substrate Velocity data (tuple): A tuple of two numpy arrays.
      Returns: tuple: Filtered data with NaNs removed.
     """
+    t0 = MMprofile.start()
     # Make sure the input is a tuple with two numpy arrays
     if not (isinstance(data, tuple) and len(data) == 2):
         raise ValueError("Input must be a tuple with two numpy arrays.")
@@ -24,6 +99,7 @@ def MMhandler(data):
     mask = ~np.isnan(data[0]) & ~np.isnan(data[1])
     # Filter
     filtered_data = (data[0][mask], data[1][mask])
+    MMprofile.emit('MMhandler', t0, n_in=len(mask), n_out=len(filtered_data[0]))
     return filtered_data
 
 # Define equations
@@ -45,35 +121,57 @@ def kcat(Vmax: float,Et: float) -> float:
     '''
     return Vmax/Et
 
-def LBfitter(eSV: tuple):
+def LBfitter(eSV: tuple, robust: str = None, n_trials: int = 64, seed=None):
     '''
     Given substrates and velocity data, the function removes outliers by computing z-score, fits data to Lineweaver-Burk equation and optimizes fitting using sum of squares
+    robust replaces the single z-score pass: 'huber' or 'soft_l1' downweight outliers by iteratively reweighted least
+    squares in reciprocal space, 'ransac' keeps the consensus inliers of random two-point fits (see MMfitter_batch).
 
-    Inputs: eSV:(Experimental data) tuple with two arrays (substrate array, velocities array)
+    Inputs: eSV:(Experimental data) tuple with two arrays (substrate array, velocities array), robust: None, 'huber', 'soft_l1' or 'ransac'
+    n_trials, seed: RANSAC subsets and random seed, as in MMfitter_batch
     :return: tuple with two arrays of fitted data (substrate array, velocities array), Km, Vmax, Vmax standard error and Vmax 95% Confidence interval
     '''
+    from scipy import stats
+    _check_robust(robust)
     # Handle data
     eSV = MMhandler(eSV)
 
     srecep = 1/(eSV[0]) # substrates
     vrecep = 1/(eSV[1]) # velocities
-    #Calculate zscore to remove outliers (> 2 SD)
-    z_scores = stats.zscore(vrecep)
-    filtered_vrecep = vrecep[np.abs(z_scores) < 2]
-    filtered_srecep = np.delete(srecep, np.where(np.abs(z_scores) > 2)) #Remove corresponding indices from substrate concentrations
+    if robust is None:
+        #Calculate zscore to remove outliers (> 2 SD)
+        t0 = MMprofile.start()
+        z_scores = stats.zscore(vrecep)
+        filtered_vrecep = vrecep[np.abs(z_scores) < 2]
+        filtered_srecep = np.delete(srecep, np.where(np.abs(z_scores) > 2)) #Remove corresponding indices from substrate concentrations
+        weights = 1.0
+        MMprofile.emit('LBfitter.zscore', t0, n_removed=len(vrecep) - len(filtered_vrecep))
+        # Initial guess by linear regression of LB equation
+        initial_slope, initial_intercept, *_ = stats.linregress(filtered_srecep, filtered_vrecep)
+    else:
+        t0 = MMprofile.start()
+        S, V, w = _batch_handler(eSV[0], eSV[1])
+        if robust == 'ransac':
+            weights = w*_ransac_mask(S, V, w, n_trials, seed)
+        else:
+            weights = _LBirls(S, V, w, robust)
+        filtered_srecep, filtered_vrecep, weights = srecep, vrecep, weights[0]
+        # Initial guess by the weighted linear regression of LB equation
+        initial_slope, initial_intercept = (p[0] for p in _LBregression(srecep[None, :], vrecep[None, :], weights[None, :]))
+        MMprofile.emit('LBfitter.robust', t0, mode=robust, n_downweighted=int((weights < 1).sum()))
     def objective(params):
         slope, intercept = params
         y_pred = slope * filtered_srecep + intercept
-        return np.sum((filtered_vrecep - y_pred) ** 2)  # Minimize the residual sum of squares
-    # Initial guess by linear regression of LB equation
-    initial_slope, initial_intercept, *_ = stats.linregress(filtered_srecep, filtered_vrecep)
+        return np.sum(weights*(filtered_vrecep - y_pred) ** 2)  # Minimize the residual sum of squares
     bounds = [(-np.inf, np.inf), (0, np.inf)]      # Reject negative values for y-intercept
     # Optimization
+    t0 = MMprofile.start()
     optimized = op.minimize(
         objective,
         x0=[initial_slope, max(0, initial_intercept),],
         bounds=bounds
     )
+    MMprofile.emit('LBfitter.minimize', t0, nit=optimized.nit, nfev=optimized.nfev, success=bool(optimized.success))
 
     # Extract optimized parameters
     slope, intercept = optimized.x
@@ -82,12 +180,16 @@ def LBfitter(eSV: tuple):
     Km = Vmax * slope
 
     # Calculate Std error (Prof Herbert Recommendation) [I had to do it manually]
+    # In robust mode these are those of the weighted problem, so rejected outliers do not inflate them
+    # (weighted residuals, with the sum of the weights as the effective number of points)
+    w = np.broadcast_to(weights, srecep.shape)
+    n = np.sum(w)
     predicted = slope * srecep + intercept
     residuals = 1/vrecep - 1/predicted
-    residual_variance = np.sum(residuals ** 2) / (len(srecep) - 2)
+    residual_variance = np.sum(w * residuals ** 2) / (n - 2)
     # Standard error for slope and intercept
-    x_mean = np.mean(1/srecep)
-    Vmax_stderr = np.sqrt(residual_variance * (1 / len(srecep) + x_mean ** 2 / np.sum(((1/srecep) - x_mean) ** 2)))
+    x_mean = np.sum(w/srecep) / n
+    Vmax_stderr = np.sqrt(residual_variance * (1 / n + x_mean ** 2 / np.sum(w * ((1/srecep) - x_mean) ** 2)))
     # Confidence Intervals for slope and intercept
     #minslope95, maxslope95 = x_mean - (slope_stderr * 1.96), x_mean + (slope_stderr * 1.96)
     minVmax95, maxVmax95 = Vmax - (Vmax_stderr * 1.96), Vmax + (Vmax_stderr * 1.96)
@@ -98,17 +200,91 @@ def LBfitter(eSV: tuple):
     fittedLB = (fittedx, fittedy)
     return fittedLB, Km, Vmax , Vmax_stderr, [minVmax95, maxVmax95]
 
-def MMfitter(eSV: tuple):
+def MMjacobian(S, Km, Vmax):
+    '''
+    Analytic Jacobian of the Michaelis-Menten equation with respect to its parameters.
+
+    Inputs: Michaelis-Menten equation parameters (S, Km, Vmax), arrays are broadcast together.
+    Output: array with a trailing axis of size two holding (dV/dKm, dV/dVmax) = (-Vmax*S/(Km+S)^2, S/(Km+S))
+    '''
+    dVmax = S/(Km + S)
+    dKm = -Vmax*dVmax/(Km + S)
+    return np.stack(np.broadcast_arrays(dKm, dVmax), axis=-1)
+
+def MMfitter(eSV: tuple, method: str = 'analytic', robust: str = None, n_trials: int = 64, seed=None):
     '''
     Fits velocity and substrate data to Michaelis Menten equation and optimizes fitting using sum of squares
-    N.B. the function uses LBfitter to compute an initial guess for Michaelis Menten parameters
+    method='analytic' (default) solves the bounded least-squares problem once with the analytic Jacobian (MMjacobian),
+    starting from a closed-form Lineweaver-Burk regression, and derives the covariance from J^T J at that solution.
+    method='minimize' is the original path: an LBfitter initial guess, op.minimize on the RSS and a separate
+    op.curve_fit for the covariance. It is kept so results can be compared.
+    robust (analytic method only) makes the fit resistant to outliers: 'huber' and 'soft_l1' refit with that
+    least_squares loss, its scale set from the MAD of the plain fit's residuals; 'ransac' fits the consensus inliers
+    of random two-point fits. SSR and the covariance are then those of the robustly weighted problem.
+    Fits from two points or fewer are returned with success=False.
     Inputs:
     eSV: (Experimental data) tuple with two arrays (substrate array, velocities array)
-    :return: tuple with two arrays of fitted data (substrate array, velocities array), optimized parameters (Vmax,Km), covariance of optimized parameters,
+    method: 'analytic' or 'minimize', robust: None, 'huber', 'soft_l1' or 'ransac'
+    n_trials, seed: RANSAC subsets and random seed, as in MMfitter_batch
+    :return: tuple with two arrays of fitted data (substrate array, velocities array), optimized parameters (Km,Vmax), covariance of optimized parameters,
     results.success {boolean for the occurance of minimization}, SSR: Minimized sum of squared residuals
     '''
+    if method not in ('analytic', 'minimize'):
+        raise ValueError("method must be 'analytic' or 'minimize'.")
+    _check_robust(robust)
+    if robust is not None and method != 'analytic':
+        raise ValueError("robust fitting is only available with method='analytic'.")
     # Handle data
     eSV = MMhandler(eSV)
+    if method == 'minimize':
+        return _MMfitter_minimize(eSV)
+
+    S, V = eSV[0].astype(float), eSV[1].astype(float)
+    w = np.ones(len(S))
+    if robust == 'ransac':
+        w = _ransac_mask(S[None, :], V[None, :], w[None, :], n_trials, seed)[0].astype(float)
+    Km0, Vmax0 = _LBguess(S[None, :], V[None, :], w[None, :])
+    x0 = np.maximum([Km0[0], Vmax0[0]], 1e-12)  # least_squares needs a start strictly inside the bounds
+    inliers = w > 0
+    Si, Vi = S[inliers], V[inliers]
+    t0 = MMprofile.start()
+    result = op.least_squares(lambda p: MMvelocity(Si, *p) - Vi, x0=x0,
+                              jac=lambda p: MMjacobian(Si, *p), bounds=([0, 0], [np.inf, np.inf]))
+    if robust in _ROBUST_SCALE:
+        f_scale = _ROBUST_SCALE[robust]*_mad_scale(result.fun[None, :], w[None, :])[0]
+        f_scale = max(f_scale, np.finfo(float).eps*np.abs(V).max())
+        result = op.least_squares(lambda p: MMvelocity(S, *p) - V, x0=np.maximum(result.x, 1e-12),
+                                  jac=lambda p: MMjacobian(S, *p), bounds=([0, 0], [np.inf, np.inf]),
+                                  loss=robust, f_scale=f_scale)
+        w = _robust_weights(result.fun[None, :], np.array([f_scale]), robust)[0]
+    MMprofile.emit('MMfitter.least_squares', t0, nfev=result.nfev, njev=result.njev, status=result.status,
+                   success=bool(result.success))
+    popt = result.x
+    if robust is None or robust == 'ransac':
+        SSR = 2*result.cost  # least_squares reports cost = SSR/2
+        J = result.jac
+    else:
+        # The loss changes cost and jac, so use the weighted problem the robust solution solves
+        SSR = np.sum(w*result.fun**2)
+        J = np.sqrt(w)[:, None]*MMjacobian(S, *popt)
+    # Covariance from the same solution, scaled like curve_fit
+    n_used = int((w > 0).sum())
+    try:
+        pcov = np.linalg.inv(J.T @ J)*(SSR/(n_used - 2) if n_used > 2 else np.inf)
+    except np.linalg.LinAlgError:
+        pcov = np.full((2, 2), np.inf)
+
+    fittedSV = (eSV[0], MMvelocity(eSV[0], *popt))
+    # Two parameters need more than two points to be determined with any residual left
+    success = bool(result.success) and n_used > 2
+    return fittedSV, popt, pcov, success, SSR
+
+def _MMfitter_minimize(eSV: tuple):
+    '''
+    Original MMfitter path: op.minimize on the RSS from an LBfitter initial guess plus op.curve_fit for the covariance.
+    Inputs: eSV: handled experimental data tuple (substrate array, velocities array)
+    :return: same tuple as MMfitter
+    '''
     def residual_sum_of_squares(params):
         Vmax, Km = params
         predicted = MMvelocity(eSV[0], Vmax, Km)
@@ -120,11 +296,15 @@ def MMfitter(eSV: tuple):
     initial_guess = [LBfunc[2], LBfunc[1]]
 
     # Minimize the RSS
+    t0 = MMprofile.start()
     result = op.minimize(residual_sum_of_squares, initial_guess, bounds=[(0, None), (0, None)])
+    MMprofile.emit('MMfitter.minimize', t0, nit=result.nit, nfev=result.nfev, success=bool(result.success))
     popt = result.x  # Optimized parameters
 
     # Covariance estimation from curve_fit for comparison
+    t0 = MMprofile.start()
     popt_curvefit, pcov_curvefit = op.curve_fit(MMvelocity, eSV[0], eSV[1])
+    MMprofile.emit('MMfitter.curve_fit', t0)
 
     # Fitted substrate and velocities using minimized parameters
     fittedSV = (eSV[0], MMvelocity(eSV[0], *popt))
@@ -132,23 +312,673 @@ def MMfitter(eSV: tuple):
 
     return fittedSV, popt, pcov_curvefit, result.success, SSR
 
+# Batched fitting
+def _batch_handler(S, V, mask=None):
+    '''
+    Batch counterpart of MMhandler: broadcasts substrate and velocity matrices to a common 2-D shape (one curve per row)
+    and folds NaNs and the optional mask into a 0/1 weight matrix instead of dropping entries, so every row keeps the same length.
+
+    Inputs: S, V: array-likes broadcastable to (n_curves, n_points); mask: optional boolean array, True for points to keep.
+    :return: S, V and weight matrices of shape (n_curves, n_points); masked entries are replaced by harmless placeholders.
+    '''
+    S = np.asarray(S)
+    V = np.asarray(V)
+    if not (np.issubdtype(S.dtype, np.number) and np.issubdtype(V.dtype, np.number)):
+        raise ValueError("Both sets must contain only numeric values.")
+    S, V = np.broadcast_arrays(np.atleast_2d(S).astype(float), np.atleast_2d(V).astype(float))
+    if S.ndim != 2:
+        raise ValueError("Substrate and velocity data must be 2-D with one curve per row.")
+    valid = np.isfinite(S) & np.isfinite(V)
+    if mask is not None:
+        valid &= np.broadcast_to(np.asarray(mask, dtype=bool), S.shape)
+    # Placeholders keep NaNs out of the row sums; their weight is zero
+    S = np.where(valid, S, 1.0)
+    V = np.where(valid, V, 0.0)
+    return S, V, valid.astype(float)
+
+def _LBregression(x, y, w):
+    '''
+    Row-wise weighted linear regression y = slope*x + intercept; non-finite points get zero weight.
+
+    Inputs: x, y, w: (n_curves, n_points) abscissa, ordinate and weight matrices
+    :return: slope, intercept as 1-D arrays
+    '''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        wl = np.where(np.isfinite(x) & np.isfinite(y), w, 0.0)
+        x = np.where(wl > 0, x, 0.0)
+        y = np.where(wl > 0, y, 0.0)
+        sw = wl.sum(axis=1)
+        xm = (wl*x).sum(axis=1)/sw
+        ym = (wl*y).sum(axis=1)/sw
+        dx = x - xm[:, None]
+        slope = (wl*dx*(y - ym[:, None])).sum(axis=1)/(wl*dx**2).sum(axis=1)
+        intercept = ym - slope*xm
+    return slope, intercept
+
+def _LBguess(S, V, w):
+    '''
+    Row-wise weighted Lineweaver-Burk regression used as the starting point of the batched Michaelis-Menten fit.
+    Rows where the regression gives a non-physical intercept fall back to Vmax = max(V) and Km = mean(S), clipped to be
+    positive so every start lies inside the bounds of the fit.
+
+    Inputs: S, V, w: (n_curves, n_points) substrate, velocity and weight matrices (see _batch_handler)
+    :return: Km, Vmax initial guesses as 1-D arrays
+    '''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope, intercept = _LBregression(1/S, 1/V, w)
+        Vmax = 1/intercept
+        Km = slope*Vmax
+        sw_all = w.sum(axis=1)
+        fallback = ~(np.isfinite(Km) & np.isfinite(Vmax) & (Km > 0) & (Vmax > 0))
+        Vmax = np.where(fallback, np.max(np.where(w > 0, V, -np.inf), axis=1, initial=-np.inf), Vmax)
+        Km = np.where(fallback, (w*S).sum(axis=1)/sw_all, Km)
+        # Non-positive or empty rows still get a feasible start; their fit is flagged by MMfitter_batch
+        Vmax = np.where(np.isfinite(Vmax) & (Vmax > 0), Vmax, np.maximum(np.max(np.abs(w*V), axis=1, initial=0), 1e-12))
+        Km = np.where(np.isfinite(Km) & (Km > 0), Km, np.maximum(np.max(np.abs(w*S), axis=1, initial=0), 1e-12))
+    return Km, Vmax
+
+# Robust fitting
+# Loss thresholds in units of the residual scale (1.4826*MAD), used as least_squares f_scale and for IRLS weights
+_ROBUST_SCALE = {'huber': 1.345, 'soft_l1': 1.0}
+
+def _check_robust(robust):
+    if robust not in (None, 'huber', 'soft_l1', 'ransac'):
+        raise ValueError("robust must be None, 'huber', 'soft_l1' or 'ransac'.")
+
+def _mad_scale(r, w):
+    '''
+    Row-wise robust residual scale, 1.4826 times the median absolute deviation over points with positive weight.
+    '''
+    r = np.where(w > 0, r, np.nan)
+    with np.errstate(invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN rows give NaN
+        med = np.nanmedian(r, axis=1, keepdims=True)
+        return 1.4826*np.nanmedian(np.abs(r - med), axis=1)
+
+def _robust_weights(r, f_scale, robust):
+    '''
+    IRLS weights rho'(z), z = (r/f_scale)^2, of the least_squares 'huber' and 'soft_l1' losses, so that reweighted
+    least squares converges to the same solution as least_squares(loss=robust, f_scale=f_scale).
+
+    Inputs: r: (n_curves, n_points) residuals, f_scale: (n_curves,) loss thresholds, robust: 'huber' or 'soft_l1'
+    :return: weights in [0, 1]
+    '''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (r/f_scale[:, None])**2
+        if robust == 'huber':
+            weights = np.where(z <= 1, 1.0, 1/np.sqrt(z))
+        else:
+            weights = 1/np.sqrt(1 + z)
+    return np.where(np.isnan(z), 1.0, weights)
+
+def _robust_rho(z, robust):
+    # least_squares loss functions of z = (r/f_scale)^2
+    if robust == 'huber':
+        return np.where(z <= 1, z, 2*np.sqrt(z) - 1)
+    return 2*(np.sqrt(1 + z) - 1)
+
+def _LBirls(S, V, w, robust, max_iter: int = 50, tol: float = 1e-8):
+    '''
+    Iteratively reweighted Lineweaver-Burk regression, vectorized across rows.
+
+    Inputs: S, V, w: (n_curves, n_points) matrices (see _batch_handler), robust: 'huber' or 'soft_l1'
+    :return: final weight matrix (w times the robust weights)
+    '''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x, y = 1/S, 1/V
+        slope, intercept = _LBregression(x, y, w)
+        r = y - (slope[:, None]*x + intercept[:, None])
+        f_scale = _ROBUST_SCALE[robust]*_mad_scale(r, w)
+        weights = w
+        for _ in range(max_iter):
+            weights = w*_robust_weights(r, f_scale, robust)
+            new_slope, new_intercept = _LBregression(x, y, weights)
+            done = np.all(~np.isfinite(new_slope) | ((np.abs(new_slope - slope) <= tol*np.abs(slope))
+                                                     & (np.abs(new_intercept - intercept) <= tol*np.abs(intercept))))
+            slope, intercept = new_slope, new_intercept
+            r = y - (slope[:, None]*x + intercept[:, None])
+            if done:
+                break
+    return weights
+
+def _ransac_mask(S, V, w, n_trials: int = 64, seed=None):
+    '''
+    RANSAC-style consensus, vectorized across rows and trials: every trial draws two distinct valid points, solves
+    the Michaelis-Menten curve through them (a line in Lineweaver-Burk coordinates) and counts the points within
+    2.5 robust standard deviations in velocity space. The scale is the least-median-of-squares estimate of the best
+    trial, and ties in inlier count go to the trial with the lower median residual. Rows with fewer than three valid
+    points keep all their points.
+
+    Inputs: S, V, w: (n_curves, n_points) matrices (see _batch_handler), n_trials: random subsets per curve,
+    seed: random seed for reproducible masks
+    :return: boolean (n_curves, n_points) inlier mask
+    '''
+    valid = w > 0
+    if S.shape[1] < 3:
+        return valid  # No row can have three valid points
+    rng = np.random.default_rng(seed)
+    n_valid = valid.sum(axis=1)
+    keys = rng.random((S.shape[0], n_trials, S.shape[1]))
+    keys[np.broadcast_to(~valid[:, None, :], keys.shape)] = np.inf
+    pairs = np.argpartition(keys, 1, axis=2)[..., :2]  # The two smallest keys are two distinct valid points
+    x = np.take_along_axis(1/S[:, None, :], pairs, axis=2)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        y = np.take_along_axis(1/V[:, None, :], pairs, axis=2)
+        slope = (y[..., 1] - y[..., 0])/(x[..., 1] - x[..., 0])
+        Vmax = 1/(y[..., 0] - slope*x[..., 0])
+        Km = slope*Vmax
+        sq = (V[:, None, :] - MMvelocity(S[:, None, :], Km[..., None], Vmax[..., None]))**2
+        usable = (Km > 0) & (Vmax > 0) & np.isfinite(Km) & np.isfinite(Vmax)
+        sq = np.where(valid[:, None, :] & usable[..., None] & np.isfinite(sq), sq, np.inf)
+        # Least median of squares scale (Rousseeuw) of the best trial
+        h = np.maximum(n_valid//2, 0)
+        med = np.take_along_axis(np.sort(sq, axis=2), np.broadcast_to(h[:, None, None], sq.shape[:2] + (1,)), axis=2)[..., 0]
+        best_med = med.min(axis=1)
+        sigma = 1.4826*(1 + 5/np.maximum(n_valid - 2, 1))*np.sqrt(best_med)
+        # Exact data has a zero scale; keep points within rounding error of the curve
+        sigma = np.maximum(sigma, 1e-9*np.max(np.abs(np.where(valid, V, 0.0)), axis=1))
+        threshold = (2.5*sigma)**2
+        count = (sq <= threshold[:, None, None]).sum(axis=2)
+        score = count - np.where(np.isfinite(med), med/(med + best_med[:, None] + np.finfo(float).tiny), 1.0)
+    best = np.argmax(score, axis=1)
+    mask = sq[np.arange(S.shape[0]), best] <= threshold[:, None]
+    small = (n_valid < 3) | ~np.isfinite(sigma)
+    return np.where(small[:, None], valid, mask & valid)
+
+def _LMbatch(S, V, w, Km, Vmax, max_iter: int, tol: float, robust: str = None, f_scale=None):
+    '''
+    Levenberg-Marquardt iterations of the weighted Michaelis-Menten problem, vectorized across rows.
+    With a robust loss the cost is sum(w*f_scale^2*rho((r/f_scale)^2)) as in least_squares, and every iteration
+    solves the normal equations with the IRLS weights of the current residuals.
+
+    Inputs: S, V, w: (n_curves, n_points) matrices (see _batch_handler), Km, Vmax: starting values,
+    max_iter, tol: see MMfitter_batch, robust: None, 'huber' or 'soft_l1', f_scale: (n_curves,) loss thresholds
+    :return: Km, Vmax, minimized cost (weighted SSR without a robust loss), converged and failed flags, number of iterations
+    '''
+    Km, Vmax = Km.copy(), Vmax.copy()
+
+    def ssr_of(rows, Km, Vmax):
+        r = V[rows] - Vmax[:, None]*S[rows]/(Km[:, None] + S[rows])
+        if robust is None:
+            return (w[rows]*r**2).sum(axis=1)
+        f2 = f_scale[rows, None]**2
+        return (w[rows]*f2*_robust_rho(r**2/f2, robust)).sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        SSR = ssr_of(slice(None), Km, Vmax)
+        lam = np.full(Km.shape, 1e-3)
+        # Nothing to iterate on for degenerate rows or rows with fewer than two points
+        failed = ~np.isfinite(SSR) | ((w > 0).sum(axis=1) < 2)
+        converged = failed.copy()
+        n_iter = 0
+        for n_iter in range(1, max_iter + 1):
+            # Only rows still iterating are computed, so the cost shrinks as curves converge
+            rows = np.flatnonzero(~converged)
+            if rows.size == 0:
+                break
+            Sa, Va, wa = S[rows], V[rows], w[rows]
+            Kma, Vmaxa, SSRa, lama = Km[rows], Vmax[rows], SSR[rows], lam[rows]
+            J = MMjacobian(Sa, Kma[:, None], Vmaxa[:, None])
+            dKm, dVmax = J[..., 0], J[..., 1]
+            r = Va - Vmaxa[:, None]*dVmax
+            if robust is not None:
+                wa = wa*_robust_weights(r, f_scale[rows], robust)
+            # Normal equations (J^T W J) with Marquardt scaling of the diagonal
+            a = (wa*dKm**2).sum(axis=1)
+            b = (wa*dKm*dVmax).sum(axis=1)
+            c = (wa*dVmax**2).sum(axis=1)
+            gk = (wa*dKm*r).sum(axis=1)
+            gv = (wa*dVmax*r).sum(axis=1)
+            a_ = a*(1 + lama)
+            c_ = c*(1 + lama)
+            det = a_*c_ - b**2
+            stepKm = (c_*gk - b*gv)/det
+            stepVmax = (a_*gv - b*gk)/det
+            newKm = Kma + stepKm
+            newVmax = Vmaxa + stepVmax
+            newSSR = ssr_of(rows, newKm, newVmax)
+            accept = np.isfinite(newSSR) & (newSSR <= SSRa) & (newKm > 0) & (newVmax > 0)
+            small = (np.abs(stepKm) <= tol*(np.abs(Kma) + tol)) & (np.abs(stepVmax) <= tol*(np.abs(Vmaxa) + tol))
+            flat = (SSRa - newSSR) <= tol*SSRa
+            Km[rows] = np.where(accept, newKm, Kma)
+            Vmax[rows] = np.where(accept, newVmax, Vmaxa)
+            SSR[rows] = np.where(accept, newSSR, SSRa)
+            lam[rows] = lama = np.where(accept, np.maximum(lama/3, 1e-12), lama*4)
+            # A row stops once an accepted step no longer changes anything, or when no descent step exists any more
+            # from a feasible point
+            converged[rows] = (accept & (small | flat)) | ((lama > 1e12) & (Kma > 0) & (Vmaxa > 0))
+    return Km, Vmax, SSR, converged, failed, n_iter
+
+def MMfitter_batch(S_matrix, V_matrix, mask=None, max_iter: int = 200, tol: float = 1e-10, robust: str = None,
+                   n_trials: int = 64, seed=None):
+    '''
+    Fits many Michaelis-Menten curves at once with Levenberg-Marquardt iterations vectorized across the batch.
+    Each row of S_matrix/V_matrix is one curve; a 1-D S_matrix is shared by all rows of V_matrix. NaNs (and entries
+    where mask is False) are ignored, so curves of different lengths can be padded with NaN into one matrix.
+    Km and Vmax are kept positive, like the bounds used by MMfitter.
+    robust makes every curve resistant to outliers in the same single call: 'huber' and 'soft_l1' run iteratively
+    reweighted least squares towards the same solution as MMfitter(robust=...), 'ransac' fits only the consensus
+    inliers of n_trials random two-point fits per curve. SSR and covariance are then those of the weighted problem.
+
+    Inputs:
+    S_matrix, V_matrix: (n_curves, n_points) substrate and velocity arrays
+    mask: optional boolean array of the same shape, True for points to use in the fit
+    max_iter: maximum number of Levenberg-Marquardt iterations, tol: relative tolerance on SSR and parameter steps
+    robust: None, 'huber', 'soft_l1' or 'ransac', n_trials, seed: RANSAC subsets per curve and random seed
+    :return: tuple with optimized parameters (n_curves, 2) ordered (Km, Vmax) like MMfitter, covariance of optimized
+    parameters (n_curves, 2, 2), success flags (n_curves,) and minimized sums of squared residuals (n_curves,)
+    '''
+    _check_robust(robust)
+    t0 = MMprofile.start()
+    S, V, w = _batch_handler(S_matrix, V_matrix, mask)
+    if robust == 'ransac':
+        w = w*_ransac_mask(S, V, w, n_trials, seed)
+    Km, Vmax = _LBguess(S, V, w)
+    Km, Vmax, SSR, converged, failed, n_iter = _LMbatch(S, V, w, Km, Vmax, max_iter, tol)
+
+    if robust in _ROBUST_SCALE:
+        # Loss threshold from the residual scale of the plain fit, then the robust problem from that solution
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            r = V - MMvelocity(S, Km[:, None], Vmax[:, None])
+            f_scale = _ROBUST_SCALE[robust]*_mad_scale(r, w)
+            f_scale = np.maximum(f_scale, np.finfo(float).eps*np.max(np.abs(w*V), axis=1, initial=0))
+            Km, Vmax, _, converged, failed, it = _LMbatch(S, V, w, Km, Vmax, max_iter, tol, robust, f_scale)
+            n_iter += it
+            r = V - MMvelocity(S, Km[:, None], Vmax[:, None])
+            w = w*_robust_weights(r, f_scale, robust)
+            SSR = (w*r**2).sum(axis=1)
+
+    n_obs = (w > 0).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # Covariance from the Jacobian at the solution, scaled like curve_fit: inv(J^T W J) * SSR/(n - 2)
+        J = MMjacobian(S, Km[:, None], Vmax[:, None])
+        dKm, dVmax = J[..., 0], J[..., 1]
+        a = (w*dKm**2).sum(axis=1)
+        b = (w*dKm*dVmax).sum(axis=1)
+        c = (w*dVmax**2).sum(axis=1)
+        det = a*c - b**2
+        scale = np.where(n_obs > 2, SSR/(n_obs - 2), np.inf)
+        pcov = np.empty(Km.shape + (2, 2))
+        pcov[:, 0, 0] = c/det*scale
+        pcov[:, 0, 1] = pcov[:, 1, 0] = -b/det*scale
+        pcov[:, 1, 1] = a/det*scale
+    popt = np.column_stack([Km, Vmax])
+    # Rows with fewer than two points cannot be fitted at all
+    empty = n_obs < 2
+    popt[empty] = np.nan
+    pcov[empty] = np.nan
+    SSR = np.where(empty, np.nan, SSR)
+    success = (converged & ~failed & np.isfinite(SSR) & np.all(np.isfinite(popt), axis=1) & (n_obs >= 2)
+               & (Km > 0) & (Vmax > 0))
+    MMprofile.emit('MMfitter_batch', t0, n_curves=len(success), iterations=n_iter, converged=int(success.sum()),
+                   unconverged=int((~converged).sum()))
+    return popt, pcov, success, SSR
+
+class MMonline:
+    '''
+    Incremental fitter for substrate/velocity points arriving one at a time (e.g. during a stopped-flow run).
+    The Lineweaver-Burk regression is kept as running sums of the reciprocals, so its estimate costs O(1) per point.
+    The Michaelis-Menten fit is warm-started from the previous solution and refined with at most max_iter
+    Levenberg-Marquardt iterations (analytic Jacobian), instead of a full MMhandler/LBfitter/MMfitter refit.
+    Each refinement is O(n) in the points received so far, so it runs when the point count has grown by the factor
+    growth since the last one (on every append while there are few points); in between, Km and Vmax keep the last
+    refined values and LBestimate stays current. A run of n points then costs O(n) in total, amortized O(1) per
+    append. growth=1 refines on every append, which makes each append O(n) and the run O(n^2).
+    Points are kept in a buffer that grows by doubling.
+
+    Inputs: max_iter: Levenberg-Marquardt iterations per refinement, capacity: initial buffer size,
+    growth: point count factor between refinements
+    Usage: fitter = MMonline(); for S, V in stream: Km, Vmax = fitter.append(S, V)
+    '''
+    def __init__(self, max_iter: int = 3, capacity: int = 64, growth: float = 1.1):
+        if growth < 1:
+            raise ValueError("growth must be at least 1.")
+        self.max_iter = max_iter
+        self.growth = growth
+        self._next = 2  # Point count of the next refinement
+        self._S = np.empty(capacity)
+        self._V = np.empty(capacity)
+        self.n = 0
+        self._sums = np.zeros(5)  # n, sum(1/S), sum(1/V), sum(1/S^2), sum(1/(S*V))
+        self.popt = np.full(2, np.nan)
+        self.SSR = np.nan
+        self.success = False
+        self._lam = 1e-3  # Levenberg-Marquardt damping, carried over between appends
+
+    @property
+    def Km(self) -> float:
+        return self.popt[0]
+
+    @property
+    def Vmax(self) -> float:
+        return self.popt[1]
+
+    @property
+    def pcov(self) -> np.ndarray:
+        '''
+        Covariance of (Km, Vmax) at the current estimate, computed on access like MMfitter's (J^T J)^-1 * SSR/(n - 2)
+        over all points received so far.
+        '''
+        S, V = self.eSV
+        if not np.all(np.isfinite(self.popt)):
+            return np.full((2, 2), np.nan)
+        J = MMjacobian(S, *self.popt)
+        SSR = np.sum((V - MMvelocity(S, *self.popt))**2)
+        try:
+            return np.linalg.inv(J.T @ J)*(SSR/(len(S) - 2) if len(S) > 2 else np.inf)
+        except np.linalg.LinAlgError:
+            return np.full((2, 2), np.inf)
+
+    @property
+    def eSV(self) -> tuple:
+        '''
+        Points received so far (substrate array, velocities array), as views of the internal buffer.
+        '''
+        return self._S[:self.n], self._V[:self.n]
+
+    def LBestimate(self) -> tuple:
+        '''
+        Lineweaver-Burk (Km, Vmax) from the running sums, NaN until two points with positive S and V are available.
+        '''
+        n, sx, sy, sxx, sxy = self._sums
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (n*sxy - sx*sy)/(n*sxx - sx**2)
+            Vmax = n/(sy - slope*sx)
+        return slope*Vmax, Vmax
+
+    def append(self, S, V) -> tuple:
+        '''
+        Adds one point (or a few, as arrays) and refines the fit when it is due. NaN points are ignored.
+
+        Inputs: S, V: substrate and velocity value(s)
+        :return: current (Km, Vmax) estimate
+        '''
+        S = np.atleast_1d(np.asarray(S, dtype=float))
+        V = np.atleast_1d(np.asarray(V, dtype=float))
+        keep = np.isfinite(S) & np.isfinite(V)
+        S, V = S[keep], V[keep]
+        if self.n + len(S) > len(self._S):
+            capacity = max(2*len(self._S), self.n + len(S))
+            self._S = np.concatenate([self._S[:self.n], np.empty(capacity - self.n)])
+            self._V = np.concatenate([self._V[:self.n], np.empty(capacity - self.n)])
+        self._S[self.n:self.n + len(S)] = S
+        self._V[self.n:self.n + len(V)] = V
+        self.n += len(S)
+        lb = (S > 0) & (V > 0)
+        x, y = 1/S[lb], 1/V[lb]
+        self._sums += [len(x), x.sum(), y.sum(), (x*x).sum(), (x*y).sum()]
+        if self.n >= self._next:
+            self._refine()
+            self._next = max(self.n + 1, int(np.ceil(self.n*self.growth)))
+        return self.Km, self.Vmax
+
+    def _refine(self):
+        S, V = self.eSV
+        Km, Vmax = self.popt
+        if not (Km > 0 and Vmax > 0):
+            # First fit (or a lost one): start from the running Lineweaver-Burk estimate
+            Km, Vmax = self.LBestimate()
+            if not (Km > 0 and Vmax > 0):
+                Km, Vmax = S.mean(), V.max()
+        SSR = np.sum((V - MMvelocity(S, Km, Vmax))**2)
+        converged = False
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for _ in range(self.max_iter):
+                J = MMjacobian(S, Km, Vmax)
+                JTJ = J.T @ J
+                step = np.linalg.solve(JTJ + self._lam*np.diag(np.diag(JTJ)) + 1e-300*np.eye(2),
+                                       J.T @ (V - MMvelocity(S, Km, Vmax)))
+                newKm, newVmax = Km + step[0], Vmax + step[1]
+                newSSR = np.sum((V - MMvelocity(S, newKm, newVmax))**2) if newKm > 0 and newVmax > 0 else np.inf
+                if newSSR <= SSR:
+                    converged = (SSR - newSSR <= 1e-10*SSR or
+                                 np.all(np.abs(step) <= 1e-10*np.abs([Km, Vmax])))
+                    Km, Vmax, SSR = newKm, newVmax, newSSR
+                    self._lam = max(self._lam/3, 1e-12)
+                    if converged:
+                        break
+                else:
+                    self._lam = min(self._lam*4, 1e12)
+        self.popt = np.array([Km, Vmax])
+        self.SSR = SSR
+        self.success = converged
+
+    def fit(self, method: str = 'analytic'):
+        '''
+        Full MMfitter fit of all points received so far, e.g. to polish the final estimate at the end of a run.
+        :return: MMfitter output
+        '''
+        S, V = self.eSV
+        return MMfitter((S.copy(), V.copy()), method=method)
+
+def MMbootstrap(eSV: tuple, n_boot: int = 1000, mode: str = 'residual', alpha: float = 0.05, seed=None, workers: int = 1):
+    '''
+    Bootstrap confidence intervals for Km and Vmax. All n_boot resampled datasets are drawn as one 2-D array and fitted
+    together with MMfitter_batch. mode='residual' adds resampled residuals of the MMfitter solution to the fitted
+    velocities at the observed substrates, mode='pairs' resamples (substrate, velocity) pairs.
+    Resamples whose fit fails are left out of the intervals.
+
+    Inputs:
+    eSV: (Experimental data) tuple with two arrays (substrate array, velocities array)
+    n_boot: number of resamples, mode: 'residual' or 'pairs', alpha: 1 - confidence level (0.05 gives 95% intervals)
+    seed: seed or numpy Generator for reproducible resamples, workers: threads sharing the batch fit
+    :return: tuple with percentile confidence intervals [[Km low, Km high], [Vmax low, Vmax high]], bootstrap standard
+    errors (Km, Vmax) and the bootstrap estimates (n_boot, 2) with NaN rows for failed fits
+    '''
+    if mode not in ('residual', 'pairs'):
+        raise ValueError("mode must be 'residual' or 'pairs'.")
+    eSV = MMhandler(eSV)
+    S, V = eSV[0].astype(float), eSV[1].astype(float)
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(S), size=(n_boot, len(S)))
+    if mode == 'residual':
+        fittedSV = MMfitter(eSV)[0]
+        Sb = S
+        Vb = fittedSV[1] + (V - fittedSV[1])[idx]
+    else:
+        Sb = S[idx]
+        Vb = V[idx]
+
+    if workers > 1:
+        rows = np.array_split(np.arange(n_boot), workers)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(lambda r: MMfitter_batch(Sb if Sb.ndim == 1 else Sb[r], Vb[r]), rows))
+        popt = np.concatenate([part[0] for part in parts])
+        success = np.concatenate([part[2] for part in parts])
+    else:
+        popt, _, success, _ = MMfitter_batch(Sb, Vb)
+    samples = np.where(success[:, None], popt, np.nan)
+    ci = np.nanpercentile(samples, [100*alpha/2, 100*(1 - alpha/2)], axis=0).T
+    se = np.nanstd(samples, axis=0, ddof=1)
+    return ci, se, samples
+
+# Fit results and cache
+class MMresult(NamedTuple):
+    '''
+    All fits computed for one dataset, so the plots and the GUI can share them instead of refitting.
+
+    eSV: handled experimental data (substrate array, velocities array)
+    MM: MMfitter output, LB: LBfitter output
+    '''
+    eSV: tuple
+    MM: tuple
+    LB: tuple
+
+    @property
+    def Km(self) -> float:
+        return self.MM[1][0]
+
+    @property
+    def Vmax(self) -> float:
+        return self.MM[1][1]
+
+class _FitCache:
+    '''
+    Thread-safe LRU mapping from a content hash of the data to its MMresult. The least recently used entry is
+    evicted once more than maxsize results are stored.
+    '''
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def resize(self, maxsize: int):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'maxsize': self.maxsize, 'currsize': len(self._data)}
+
+_fit_cache = _FitCache()
+
+def _data_key(eSV: tuple, *options) -> str:
+    '''
+    Content hash of handled substrate/velocity arrays (values, dtype and shape) plus any fitting options.
+    '''
+    h = hashlib.blake2b(digest_size=20)
+    for arr in eSV:
+        arr = np.ascontiguousarray(arr)
+        h.update(f'{arr.dtype.str}{arr.shape}'.encode())
+        h.update(arr.tobytes())
+    h.update(repr(options).encode())
+    return h.hexdigest()
+
+def _freeze(obj):
+    # Cached arrays are shared between callers, so make them read-only
+    if isinstance(obj, np.ndarray):
+        obj.flags.writeable = False
+    elif isinstance(obj, (tuple, list)):
+        for item in obj:
+            _freeze(item)
+    return obj
+
+def MMfit(eSV: tuple, method: str = 'analytic', robust: str = None, n_trials: int = 64, seed=None) -> MMresult:
+    '''
+    Runs MMfitter and LBfitter once per dataset and caches the result by content hash, so repeated plots and GUI
+    renders of the same data do no refitting. Arrays in the returned result are read-only.
+    MMfit.cache_info(), MMfit.cache_clear() and MMfit.cache_resize(maxsize) inspect and manage the LRU cache, and
+    MMfit.key(eSV, ...) returns the cache key of a call, e.g. to share results in a cache across processes.
+    With robust='ransac' and no seed, the seed is derived from the data, so the result is reproducible and both fits
+    use the same inlier mask.
+
+    Inputs: eSV: (Experimental data) tuple with two arrays (substrate array, velocities array), method, robust, n_trials,
+    seed: passed to MMfitter and LBfitter
+    :return: MMresult with the handled data, the MMfitter output and the LBfitter output
+    '''
+    eSV = MMhandler(eSV)
+    t0 = MMprofile.start()
+    key = _data_key(eSV, method, robust, n_trials, seed)
+    fit = _fit_cache.get(key)
+    hit = fit is not None
+    if fit is None:
+        if robust == 'ransac' and seed is None:
+            seed = int(key[:16], 16)
+        options = dict(robust=robust, n_trials=n_trials, seed=seed)
+        fit = MMresult(eSV, MMfitter(eSV, method=method, **options), LBfitter(eSV, **options))
+        _freeze(fit)
+        _fit_cache.put(key, fit)
+    MMprofile.emit('MMfit', t0, cache_hit=hit, success=bool(fit.MM[3]))
+    return fit
+
+def _fit_key(eSV: tuple, method: str = 'analytic', robust: str = None, n_trials: int = 64, seed=None) -> str:
+    # Cache key of MMfit for the same arguments
+    return _data_key(MMhandler(eSV), method, robust, n_trials, seed)
+
+MMfit.key = _fit_key
+MMfit.cache_info = _fit_cache.info
+MMfit.cache_clear = _fit_cache.clear
+MMfit.cache_resize = _fit_cache.resize
+
 #Plotting functions
-def MMplot(expSV):
+# Figures stay bounded for dense traces: above PLOT_WEBGL_THRESHOLD points traces are drawn with WebGL, at most
+# PLOT_MAX_POINTS experimental points are sent to the browser, and fitted curves use PLOT_CURVE_POINTS points
+PLOT_WEBGL_THRESHOLD = 2000
+PLOT_MAX_POINTS = 4000
+PLOT_CURVE_POINTS = 200
+
+def _decimate(x, y, max_points):
+    '''
+    Min/max decimation for display: points are ordered by x and split into max_points//2 buckets of equal count,
+    keeping the lowest and highest y of each bucket so spikes and outliers stay visible.
+
+    Inputs: x, y: point coordinates, max_points: maximum number of points to keep (None keeps all)
+    :return: decimated x, y ordered by x (unchanged when there are at most max_points points)
+    '''
+    n = len(x)
+    if max_points is None or n <= max_points:
+        return x, y
+    order = np.argsort(x, kind='stable')
+    x, y = x[order], y[order]
+    size = -(-n//max(max_points//2, 1))  # ceil, so at most max_points//2 buckets
+    n_buckets = -(-n//size)
+    padded = np.full(n_buckets*size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(n_buckets, size)
+    finite = np.isfinite(padded)
+    offsets = np.arange(n_buckets)*size
+    low = offsets + np.argmin(np.where(finite, padded, np.inf), axis=1)
+    high = offsets + np.argmax(np.where(finite, padded, -np.inf), axis=1)
+    keep = np.unique(np.concatenate([low, high]))
+    return x[keep], y[keep]
+
+def _scatter_type(go, n_points, webgl_threshold):
+    # WebGL scatter for large traces, SVG scatter otherwise
+    return go.Scattergl if webgl_threshold is not None and n_points > webgl_threshold else go.Scatter
+
+def MMplot(expSV, fit: MMresult = None, max_points: int = PLOT_MAX_POINTS, webgl_threshold: int = PLOT_WEBGL_THRESHOLD):
     '''
     A function for interactive plotting of Michaelis Menten equation after fitting using MMfitter.
+    Large datasets are min/max decimated to max_points experimental points and drawn with WebGL above
+    webgl_threshold points; the fitted curve is evaluated on PLOT_CURVE_POINTS points, so the figure size is bounded.
 
     Inputs: expSV: (Experimental data) tuple with two arrays (substrate array, velocities array)
+    fit: optional MMresult already computed for expSV (see MMfit), otherwise the cached fit is used
+    max_points: experimental points drawn (None draws all), webgl_threshold: points above which Scattergl is used (None never)
     returns: Michaelis-Menten plot with experimental and fitted data.
     '''
+    import plotly.graph_objects as go
     # Handle data
-    expSV = MMhandler(expSV)
+    if fit is None:
+        fit = MMfit(expSV)
+    expSV = fit.eSV
 
+    t0 = MMprofile.start()
+    Scatter = _scatter_type(go, len(expSV[0]), webgl_threshold)
+    x, y = _decimate(expSV[0], expSV[1], max_points)
     figMM = go.Figure()
-    figMM.add_trace(go.Scatter(x=expSV[0], y=expSV[1], mode='markers', name='Experimental'))  # Experimental as scatter
-    fitted = MMfitter(expSV)
-    figMM.add_trace(go.Line(x=fitted[0][0], y=fitted[0][1], mode='lines', name='Fitted'))  # Fitted as line
+    figMM.add_trace(Scatter(x=x, y=y, mode='markers', name='Experimental'))  # Experimental as scatter
+    Km, Vmax = fit.MM[1]
+    xfit = np.linspace(np.min(expSV[0]), np.max(expSV[0]), PLOT_CURVE_POINTS) if len(expSV[0]) else np.empty(0)
+    figMM.add_trace(Scatter(x=xfit, y=MMvelocity(xfit, Km, Vmax), mode='lines', name='Fitted'))  # Fitted as line
     figMM.update_layout(title='Michaelis-Menten Plot', xaxis_title='Substrate concentration', yaxis_title='Velocity')
     #figMM.show()
+    MMprofile.emit('MMplot.figure', t0, n_points=len(expSV[0]), n_shown=len(x))
     return figMM
 
 def MMsimulator(Km:float,Vmax:float):
@@ -158,6 +988,7 @@ def MMsimulator(Km:float,Vmax:float):
     Inputs: Km, Vmax
     :return: simulated Michaelis-Menten plot
     '''
+    import plotly.graph_objects as go
     xsimulate = np.linspace(Km*(0.1),Km*10,100)
     ysimulate = MMvelocity(xsimulate,Km,Vmax)
     LBx = 1/xsimulate
@@ -173,23 +1004,40 @@ def MMsimulator(Km:float,Vmax:float):
     #figsimulate.show()
     return simulatedMM, simulatedLB
 
-def LBplot(expSV:tuple):
+def LBplot(expSV:tuple, fit: MMresult = None, max_points: int = PLOT_MAX_POINTS,
+           webgl_threshold: int = PLOT_WEBGL_THRESHOLD):
     '''
     A function for interactive plotting of Lineweaver-Burk plot equation after fitting using LBfitter.
+    Large datasets are decimated and drawn with WebGL as in MMplot.
 
     Inputs: expSV: (Experimental data) tuple with two arrays (substrate array, velocities array)
+    fit: optional MMresult already computed for expSV (see MMfit), otherwise the cached fit is used
+    max_points, webgl_threshold: see MMplot
     returns: Lineweaver-Burk plot with experimental and fitted data.
     '''
+    import plotly.graph_objects as go
     # Handle data
-    expSV = MMhandler(expSV)\
+    if fit is None:
+        fit = MMfit(expSV)
+    expSV = fit.eSV
 
     srecep = 1 / (expSV[0]) # substrats
     vrecep = 1 / (expSV[1]) # velocities
+    t0 = MMprofile.start()
+    Scatter = _scatter_type(go, len(srecep), webgl_threshold)
+    x, y = _decimate(srecep, vrecep, max_points)
     figLB = go.Figure()
-    figLB.add_trace(go.Scatter(x=srecep, y=vrecep, mode='markers', name='Experimental'))  # Experimental as scatter
-    LBfitted = LBfitter(expSV)
-    figLB.add_trace(go.Line(x= LBfitted[0][0], y=LBfitted[0][1], mode='lines', name='Fitted'))  # Fitted as line
+    figLB.add_trace(Scatter(x=x, y=y, mode='markers', name='Experimental'))  # Experimental as scatter
+    # The fitted line spans the LBfitter points (x-intercept -1/Km, 0 and the data), on a fixed grid
+    fittedx, fittedy = fit.LB[0]
+    finite = np.isfinite(fittedx) & np.isfinite(fittedy)
+    order = np.argsort(fittedx[finite])
+    fittedx, fittedy = fittedx[finite][order], fittedy[finite][order]
+    xfit = np.linspace(fittedx[0], fittedx[-1], PLOT_CURVE_POINTS) if len(fittedx) else fittedx
+    yfit = np.interp(xfit, fittedx, fittedy)  # Exact on a straight line
+    figLB.add_trace(Scatter(x=xfit, y=yfit, mode='lines', name='Fitted'))  # Fitted as line
     figLB.update_layout(title='Lineweaver-Burk Plot', xaxis_title='1/Substrate', yaxis_title='1/Velocity')
     #figLB.show()
+    MMprofile.emit('LBplot.figure', t0, n_points=len(expSV[0]), n_shown=len(x))
     return figLB
 
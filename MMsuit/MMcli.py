@@ -0,0 +1,201 @@
+#Dependencies
+
+#Load Packages
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import os
+import sys
+import numpy as np
+import MMsuit.MMcalc as mm
+import MMsuit.MMio as mmio
+
+# Columns of the output table, one row per fitted curve
+FIELDS = ['source', 'curve', 'n', 'Km', 'Vmax', 'Km_se', 'Vmax_se', 'Km_ci_low', 'Km_ci_high',
+          'Vmax_ci_low', 'Vmax_ci_high', 'SSR', 'success']
+
+def find_inputs(paths, pattern: tuple = ('.csv', '.parquet', '.npy')):
+    '''
+    Expands files and directories (searched recursively for files ending with pattern) into a sorted list of files.
+
+    Inputs: paths: iterable of file or directory paths, pattern: file suffix(es) to collect from directories
+    :return: list of file paths
+    '''
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names if name.lower().endswith(pattern))
+        else:
+            files.append(path)
+    return sorted(files)
+
+def read_curves(path: str):
+    '''
+    Reads an export with substrate in the first column and one velocity column per curve (a two-column file is
+    a single curve, a plate export has many velocity columns). CSV, Parquet and NPY files are read with MMio.MMread.
+
+    Inputs: path: file path
+    :return: substrate array and a list of (curve name, velocity array) pairs
+    '''
+    S, curves = mmio.MMread(path)
+    return S, list(curves.items())
+
+def _row(source, curve, n, popt, pcov, SSR, success) -> dict:
+    # Standard errors from the covariance diagonal and 95% intervals as in LBfitter (estimate ± 1.96·SE)
+    with np.errstate(invalid='ignore'):
+        se = np.sqrt(np.diag(pcov))
+    return {'source': source, 'curve': curve, 'n': int(n),
+            'Km': popt[0], 'Vmax': popt[1], 'Km_se': se[0], 'Vmax_se': se[1],
+            'Km_ci_low': popt[0] - 1.96*se[0], 'Km_ci_high': popt[0] + 1.96*se[0],
+            'Vmax_ci_low': popt[1] - 1.96*se[1], 'Vmax_ci_high': popt[1] + 1.96*se[1],
+            'SSR': SSR, 'success': bool(success)}
+
+def _failed_row(source, curve, n=0) -> dict:
+    return _row(source, curve, n, np.full(2, np.nan), np.full((2, 2), np.nan), np.nan, False)
+
+def fit_file(path: str, method: str = 'analytic', robust: str = None) -> list:
+    '''
+    Fits every curve of one file. Curves that cannot be fitted, or files that cannot be read, give rows with
+    NaN estimates and success=False instead of stopping the run.
+
+    Inputs: path: data file path, method: 'analytic' or 'minimize' (passed to MMfitter) or 'batch' (MMfitter_batch
+    on all curves of the file at once), robust: outlier handling passed to the fitter (None, 'huber', 'soft_l1', 'ransac')
+    :return: list of result rows (dicts with FIELDS as keys)
+    '''
+    try:
+        S, curves = read_curves(path)
+    except Exception:
+        return [_failed_row(path, '')]
+    if method == 'batch':
+        try:
+            V = np.vstack([v for _, v in curves])
+            popt, pcov, success, SSR = mm.MMfitter_batch(S, V, robust=robust)
+            n = (np.isfinite(S) & np.isfinite(V)).sum(axis=1)
+        except Exception:
+            return [_failed_row(path, name) for name, _ in curves]
+        return [_row(path, name, n[i], popt[i], pcov[i], SSR[i], success[i]) for i, (name, _) in enumerate(curves)]
+    rows = []
+    for name, V in curves:
+        try:
+            eSV = mm.MMhandler((S, V))
+            fittedSV, popt, pcov, success, SSR = mm.MMfitter(eSV, method=method, robust=robust)
+            rows.append(_row(path, name, len(eSV[0]), popt, pcov, SSR, success))
+        except Exception:
+            rows.append(_failed_row(path, name))
+    return rows
+
+def _fit_chunk(paths: list, method: str, robust: str = None) -> list:
+    # Unit of work sent to a worker process
+    return [row for path in paths for row in fit_file(path, method, robust)]
+
+class _CSVWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDS)
+        self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+class _ParquetWriter:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Writing Parquet output requires pyarrow (pip install pyarrow).")
+        self._pa = pa
+        self._path = path
+        self._pq = pq
+        self._writer = None
+
+    def write(self, rows):
+        if not rows:
+            return
+        table = self._pa.Table.from_pylist(rows)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is None:
+            # Nothing fitted: still leave a file with the expected columns
+            self._pq.write_table(self._pa.table({field: [] for field in FIELDS}), self._path)
+        else:
+            self._writer.close()
+
+def _open_writer(path: str):
+    if path.lower().endswith('.parquet'):
+        return _ParquetWriter(path)
+    return _CSVWriter(path)
+
+def fit_paths(paths, output: str, workers: int = None, chunksize: int = 16, method: str = 'analytic',
+              robust: str = None) -> int:
+    '''
+    Fits all curves found in paths and streams one row per curve to output (.csv or .parquet).
+    Files are sent to a process pool in chunks of chunksize files; at most two chunks per worker are in flight
+    and results are written in input order as they complete, so memory stays bounded however many files there are.
+
+    Inputs: paths: files or directories, output: output file path, workers: number of processes (default: CPU count,
+    1 runs in-process), chunksize: files per task, method, robust: see fit_file
+    :return: number of curves written
+    '''
+    files = find_inputs(paths)
+    chunks = (files[i:i + chunksize] for i in range(0, len(files), chunksize))
+    writer = _open_writer(output)
+    count = 0
+    try:
+        if workers == 1:
+            for chunk in chunks:
+                rows = _fit_chunk(chunk, method, robust)
+                writer.write(rows)
+                count += len(rows)
+            return count
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            window = 2*workers
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_fit_chunk, chunk, method, robust))
+                if len(pending) >= window:
+                    rows = pending.popleft().result()
+                    writer.write(rows)
+                    count += len(rows)
+            while pending:
+                rows = pending.popleft().result()
+                writer.write(rows)
+                count += len(rows)
+        return count
+    finally:
+        writer.close()
+
+def main(argv=None):
+    '''
+    Entry point of the mmsuit-fit command.
+    '''
+    parser = argparse.ArgumentParser(prog='mmsuit-fit',
+                                     description='Fit Michaelis-Menten curves from CSV/Parquet/NPY files (substrate in the first column, '
+                                                 'one velocity column per curve) without the GUI.')
+    parser.add_argument('inputs', nargs='+', help='CSV, Parquet or NPY files, or directories containing them')
+    parser.add_argument('-o', '--output', default='mmsuit_fits.csv', help='output file, .csv or .parquet (default: %(default)s)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes (default: all cores)')
+    parser.add_argument('--chunksize', type=int, default=16, help='files per task sent to a worker (default: %(default)s)')
+    parser.add_argument('--method', choices=['analytic', 'minimize', 'batch'], default='analytic',
+                        help='fitting path (default: %(default)s)')
+    parser.add_argument('--robust', choices=['huber', 'soft_l1', 'ransac'], default=None,
+                        help='outlier-resistant fitting (default: plain least squares)')
+    args = parser.parse_args(argv)
+    if args.robust and args.method == 'minimize':
+        parser.error('--robust needs --method analytic or batch')
+    count = fit_paths(args.inputs, args.output, workers=args.workers, chunksize=args.chunksize, method=args.method,
+                      robust=args.robust)
+    print(f'{count} curves written to {args.output}', file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
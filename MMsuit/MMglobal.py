@@ -0,0 +1,194 @@
+#Dependencies
+
+#Load Packages
+from typing import NamedTuple
+from scipy import optimize as op
+from scipy import sparse
+import numpy as np
+import MMsuit.MMcalc as mm
+
+# Parameters of each model; the inhibition constants enter as Km*(1 + I/Ki) and S*(1 + I/Kii)
+MODELS = {'MM': ('Km', 'Vmax'),
+          'competitive': ('Km', 'Vmax', 'Ki'),
+          'uncompetitive': ('Km', 'Vmax', 'Kii'),
+          'mixed': ('Km', 'Vmax', 'Ki', 'Kii')}
+
+def MMinhibited(S, I, Km, Vmax, Ki=np.inf, Kii=np.inf):
+    '''
+    Velocity of the general (mixed) inhibition model, V = Vmax*S/(Km*(1 + I/Ki) + S*(1 + I/Kii)).
+    Ki = inf gives uncompetitive, Kii = inf competitive inhibition, and I = 0 the Michaelis-Menten equation.
+
+    Inputs: S: substrate, I: inhibitor concentration, Km, Vmax, Ki, Kii: model parameters
+    Output: Velocity for given S and I
+    '''
+    return Vmax*S/(Km*(1 + I/Ki) + S*(1 + I/Kii))
+
+class MMglobalresult(NamedTuple):
+    '''
+    Result of MMglobalfitter.
+
+    model: model name, params/se: estimates and standard errors per parameter name (float for shared parameters,
+    one value per series for local ones), labels: name of every entry of popt (e.g. 'Km' or 'Vmax[3]'),
+    popt, pcov: full parameter vector and covariance, SSR: sum of squared residuals, n: number of points,
+    dof: n - number of parameters, AIC, AICc, BIC: information criteria for model comparison, success: solver status
+    '''
+    model: str
+    params: dict
+    se: dict
+    labels: list
+    popt: np.ndarray
+    pcov: np.ndarray
+    SSR: float
+    n: int
+    dof: int
+    AIC: float
+    AICc: float
+    BIC: float
+    success: bool
+
+def _series_arrays(series):
+    # Concatenates handled (S, V[, I]) series into flat point arrays plus the series index of every point
+    S, V, I, sid = [], [], [], []
+    for i, item in enumerate(series):
+        if len(item) not in (2, 3):
+            raise ValueError("Each series must be a (substrate, velocity) or (substrate, velocity, inhibitor) tuple.")
+        eSV = mm.MMhandler((np.asarray(item[0]), np.asarray(item[1])))
+        S.append(eSV[0].astype(float))
+        V.append(eSV[1].astype(float))
+        I.append(np.full(len(eSV[0]), float(item[2]) if len(item) == 3 else 0.0))
+        sid.append(np.full(len(eSV[0]), i))
+    return np.concatenate(S), np.concatenate(V), np.concatenate(I), np.concatenate(sid)
+
+def _initial_guess(series, names, local, Is):
+    # Apparent Km/Vmax per series from a batched Michaelis-Menten fit, corrected for inhibition
+    n_points = max(len(np.asarray(item[0])) for item in series)
+    Smat = np.full((len(series), n_points), np.nan)
+    Vmat = np.full((len(series), n_points), np.nan)
+    for i, item in enumerate(series):
+        Smat[i, :len(item[0])] = item[0]
+        Vmat[i, :len(item[1])] = item[1]
+    popt = mm.MMfitter_batch(Smat, Vmat)[0]
+    Km_app, Vmax_app = popt[:, 0], popt[:, 1]
+    base = Is == Is.min()
+    Km0, Vmax0 = np.nanmedian(Km_app[base]), np.nanmedian(Vmax_app[base])
+    inhibited = Is > 0
+    fallback = np.median(Is[inhibited]) if inhibited.any() else 1.0
+    guess = {'Ki': fallback, 'Kii': fallback}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Vmax_app = Vmax/(1 + I/Kii) and Km_app/Vmax_app = (Km/Vmax)*(1 + I/Ki)
+        if 'Kii' in names:
+            Kii = Is/(Vmax0/Vmax_app - 1)
+            Kii = Kii[inhibited & np.isfinite(Kii) & (Kii > 0)]
+            guess['Kii'] = np.median(Kii) if Kii.size else fallback
+        if 'Ki' in names:
+            Ki = Is/((Km_app/Vmax_app)/(Km0/Vmax0) - 1)
+            Ki = Ki[inhibited & np.isfinite(Ki) & (Ki > 0)]
+            guess['Ki'] = np.median(Ki) if Ki.size else fallback
+    a = 1 + Is/guess['Ki'] if 'Ki' in names else 1.0
+    b = 1 + Is/guess['Kii'] if 'Kii' in names else 1.0
+    per_series = {'Km': Km_app*b/a, 'Vmax': Vmax_app*b, 'Ki': np.full(len(series), guess['Ki']),
+                  'Kii': np.full(len(series), guess['Kii'])}
+    guess['Km'], guess['Vmax'] = np.nanmedian(per_series['Km']), np.nanmedian(per_series['Vmax'])
+    x0 = []
+    for name in names:
+        values = np.where(np.isfinite(per_series[name]) & (per_series[name] > 0), per_series[name], guess[name])
+        x0.extend(values if name in local else [guess[name]])
+    return np.maximum(np.asarray(x0, dtype=float), 1e-12)
+
+def MMglobalfitter(series, model: str = 'competitive', local=()):
+    '''
+    Global (shared-parameter) fit of several substrate/velocity series, e.g. replicates and inhibitor concentrations.
+    Every parameter of the model is shared by all series unless it is listed in local, in which case each series gets
+    its own value (e.g. local=('Vmax',) for replicates with different enzyme amounts). The whole problem is solved as
+    one bounded least-squares fit whose Jacobian is assembled as a sparse matrix (each point only depends on the
+    shared parameters and its own series' local parameters), so it scales to hundreds of series.
+
+    Inputs:
+    series: list of (substrate array, velocities array) or (substrate array, velocities array, inhibitor concentration)
+    model: 'MM', 'competitive', 'uncompetitive' or 'mixed' (see MODELS), local: names of per-series parameters
+    :return: MMglobalresult with estimates, standard errors, covariance and model-comparison statistics
+    '''
+    if model not in MODELS:
+        raise ValueError(f"model must be one of {', '.join(MODELS)}.")
+    names = MODELS[model]
+    unknown = set(local) - set(names)
+    if unknown:
+        raise ValueError(f"Local parameters {sorted(unknown)} are not part of the {model} model.")
+    S, V, I, sid = _series_arrays(series)
+    Is = np.array([float(item[2]) if len(item) == 3 else 0.0 for item in series])
+    if set(names) & {'Ki', 'Kii'} and not (Is > 0).any():
+        raise ValueError("Inhibition models need at least one series with a positive inhibitor concentration.")
+    n_series = len(series)
+
+    # Column of every parameter for every point
+    labels, columns = [], {}
+    for name in names:
+        if name in local:
+            columns[name] = len(labels) + np.arange(n_series)
+            labels.extend(f'{name}[{i}]' for i in range(n_series))
+        else:
+            columns[name] = np.full(n_series, len(labels))
+            labels.append(name)
+    rows = np.repeat(np.arange(len(S)), len(names))
+    cols = np.column_stack([columns[name][sid] for name in names]).ravel()
+
+    def point_params(p):
+        values = {name: p[columns[name][sid]] for name in names}
+        values.setdefault('Ki', np.inf)
+        values.setdefault('Kii', np.inf)
+        return values
+
+    def residuals(p):
+        k = point_params(p)
+        return MMinhibited(S, I, k['Km'], k['Vmax'], k['Ki'], k['Kii']) - V
+
+    def jacobian(p):
+        k = point_params(p)
+        a = 1 + I/k['Ki']
+        b = 1 + I/k['Kii']
+        D = k['Km']*a + S*b
+        v = k['Vmax']*S/D
+        derivatives = {'Km': -v*a/D, 'Vmax': S/D,
+                       'Ki': v*k['Km']*I/(k['Ki']**2*D), 'Kii': v*S*I/(k['Kii']**2*D)}
+        data = np.column_stack([derivatives[name] for name in names]).ravel()
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(S), len(labels)))
+
+    x0 = _initial_guess(series, names, local, Is)
+    result = op.least_squares(residuals, x0, jac=jacobian, bounds=(0, np.inf), method='trf',
+                              tr_solver='lsmr', x_scale='jac')
+    popt = result.x
+    SSR = 2*result.cost
+    n, k = len(S), len(labels)
+    dof = n - k
+    J = jacobian(popt)
+    JTJ = (J.T @ J).toarray()
+    try:
+        pcov = np.linalg.inv(JTJ)
+    except np.linalg.LinAlgError:
+        pcov = np.linalg.pinv(JTJ)
+    pcov = pcov*(SSR/dof if dof > 0 else np.inf)
+    with np.errstate(invalid='ignore'):
+        se_all = np.sqrt(np.diag(pcov))
+    params = {name: popt[columns[name]] if name in local else popt[columns[name][0]] for name in names}
+    se = {name: se_all[columns[name]] if name in local else se_all[columns[name][0]] for name in names}
+    with np.errstate(divide='ignore'):
+        loglik = n*np.log(SSR/n)
+    AIC = loglik + 2*k
+    AICc = AIC + 2*k*(k + 1)/(n - k - 1) if n - k - 1 > 0 else np.inf
+    BIC = loglik + k*np.log(n)
+    return MMglobalresult(model, params, se, labels, popt, pcov, SSR, n, dof, AIC, AICc, BIC, bool(result.success))
+
+def MMFtest(simple: MMglobalresult, complex: MMglobalresult):
+    '''
+    Extra-sum-of-squares F-test between two nested global fits of the same data (e.g. competitive inside mixed).
+
+    Inputs: simple: fit with fewer parameters, complex: fit with more parameters
+    :return: F statistic and p-value; a small p-value favours the more complex model
+    '''
+    from scipy import stats
+    if complex.dof >= simple.dof or complex.n != simple.n:
+        raise ValueError("The complex model must have more parameters than the simple one on the same data.")
+    df = simple.dof - complex.dof
+    # The larger model cannot fit worse; a tiny negative difference is solver tolerance
+    F = max((simple.SSR - complex.SSR)/df, 0.0)/(complex.SSR/complex.dof)
+    return F, stats.f.sf(F, df, complex.dof)
@@ -0,0 +1,61 @@
+#Dependencies
+
+#Load Packages
+import base64
+import io
+import os
+import numpy as np
+import pandas as pd
+
+def MMdecode(contents: str) -> bytes:
+    '''
+    Decodes a dcc.Upload data URL ("data:<type>;base64,<payload>") straight to bytes.
+
+    Inputs: contents: upload contents string
+    :return: decoded file bytes
+    '''
+    header, _, payload = contents.partition(',')
+    if not payload:
+        raise ValueError("Upload contents must be a base64 data URL.")
+    return base64.b64decode(payload)
+
+def _fileformat(filename) -> str:
+    name = str(filename or '').lower()
+    if name.endswith('.parquet') or name.endswith('.pq'):
+        return 'parquet'
+    if name.endswith('.npy'):
+        return 'npy'
+    return 'csv'
+
+def MMread(source, filename=None):
+    '''
+    Reads substrate/velocity data into float64 column arrays. The first column is the substrate, every other column is
+    one velocity curve, so a two-column file is a single curve and a wide plate export gives many curves.
+    Bytes are parsed in place (no intermediate str), and columns are taken from the parsed blocks without transposing
+    the table. CSV files must have a header row; .parquet needs pyarrow; .npy files hold a 2-D (points, columns) array.
+
+    Inputs: source: bytes, a binary file object or a file path; filename: used to pick the format (defaults to source if it is a path)
+    :return: substrate array and a dict of velocity arrays keyed by column name
+    '''
+    if isinstance(source, (str, os.PathLike)):
+        filename = filename or source
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)  # Shares the buffer, no copy
+    fileformat = _fileformat(filename)
+    if fileformat == 'npy':
+        array = np.load(source, allow_pickle=False)
+        if array.ndim != 2:
+            raise ValueError("NPY data must be a 2-D array with substrate in the first column.")
+        array = array.astype(np.float64, copy=False)
+        columns = {f'V{i}': array[:, i] for i in range(1, array.shape[1])}
+        S = array[:, 0]
+    else:
+        if fileformat == 'parquet':
+            df = pd.read_parquet(source)
+        else:
+            df = pd.read_csv(source, dtype=np.float64)
+        columns = {str(name): df.iloc[:, i].to_numpy(dtype=np.float64) for i, name in enumerate(df.columns) if i > 0}
+        S = df.iloc[:, 0].to_numpy(dtype=np.float64) if df.shape[1] else None
+    if not columns:
+        raise ValueError("Data must have a substrate column and at least one velocity column.")
+    return S, columns
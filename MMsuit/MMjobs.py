@@ -0,0 +1,132 @@
+#Dependencies
+
+#Load Packages
+from contextlib import contextmanager
+import os
+import time
+from MMsuit.MMsession import cache_dir
+
+class JobSlots:
+    '''
+    Limits how many background jobs run at once across all worker processes sharing one diskcache.Cache.
+    Each slot is a cache key holding the pid of the job that owns it; slots held by a process that no longer exists
+    (e.g. a job killed by cancellation) are reclaimed, so cancelled jobs never leak capacity. Jobs waiting for a slot
+    are registered too, so pending() counts every live job process and the web tier can refuse new jobs (see admit)
+    before starting a process for them.
+
+    Inputs: cache: diskcache.Cache, size: maximum number of concurrent jobs, key: prefix of the slot keys,
+    poll: seconds between attempts while all slots are busy
+    Usage: with slots.acquire(on_wait=report): run_job()
+    '''
+    def __init__(self, cache, size: int, key: str = 'mmsuit-job', poll: float = 0.1):
+        if size < 1:
+            raise ValueError("size must be at least 1.")
+        self.cache = cache
+        self.size = size
+        self.key = key
+        self.poll = poll
+
+    def _keys(self):
+        return [f'{self.key}-{i}' for i in range(self.size)]
+
+    def _reclaim(self, key):
+        # Check and delete in one transaction so two waiters cannot both free the same slot
+        with self.cache.transact():
+            holder = self.cache.get(key)
+            if holder is not None and not _alive(holder):
+                self.cache.delete(key)
+                return True
+        return False
+
+    def busy(self) -> int:
+        '''
+        :return: number of slots currently held by live processes
+        '''
+        return sum(1 for key in self._keys() if _alive(self.cache.get(key)))
+
+    def _waiting(self, add=None, remove=None) -> set:
+        # Pids of live jobs waiting for a slot, kept as one set updated in a transaction
+        key = f'{self.key}-waiting'
+        with self.cache.transact():
+            waiting = {pid for pid in self.cache.get(key, ()) if _alive(pid)}
+            if add is not None or remove is not None:
+                waiting = (waiting | {add}) - {remove, None}
+                self.cache.set(key, waiting)
+        return waiting
+
+    def pending(self) -> int:
+        '''
+        :return: number of live job processes, running or waiting for a slot
+        '''
+        return self.busy() + len(self._waiting())
+
+    def admit(self, queue: int) -> bool:
+        '''
+        Admission check made before a job process is started.
+
+        Inputs: queue: number of jobs allowed to wait for a slot
+        :return: True if fewer than size + queue job processes are alive
+        '''
+        return self.pending() < self.size + queue
+
+    @contextmanager
+    def acquire(self, on_wait=None):
+        '''
+        Waits for a free slot and holds it for the duration of the with block.
+
+        Inputs: on_wait: optional callable, called once when the job has to wait for a slot
+        '''
+        pid = os.getpid()
+        waited = False
+        while True:
+            for key in self._keys():
+                if self.cache.add(key, pid) or (self._reclaim(key) and self.cache.add(key, pid)):
+                    if waited:
+                        self._waiting(remove=pid)
+                    try:
+                        yield
+                    finally:
+                        self.cache.delete(key)
+                    return
+            if not waited:
+                self._waiting(add=pid)
+                if on_wait is not None:
+                    on_wait()
+            waited = True
+            time.sleep(self.poll)
+
+def _alive(pid) -> bool:
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+    return True
+
+def MMjobs(jobs: int = None, path: str = None):
+    '''
+    Builds the background-job backend of the GUI: a Dash DiskcacheManager running every job in its own process and
+    JobSlots bounding how many run at once. Needs the optional diskcache dependencies (pip install MMsuit[background]);
+    without them, or with jobs = 0, callbacks stay synchronous.
+
+    Inputs: jobs: maximum concurrent jobs, defaults to the MMSUIT_JOBS environment variable (0 or unset disables
+    background jobs); path: cache directory, defaults to MMSUIT_JOBS_CACHE, then a private per-user directory
+    (diskcache pickles its values, so the directory must not be writable by other users)
+    :return: (DiskcacheManager, JobSlots), or (None, None) for synchronous callbacks
+    '''
+    jobs = int(os.environ.get('MMSUIT_JOBS') or 0) if jobs is None else jobs
+    if jobs <= 0:
+        return None, None
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+    except ImportError:
+        import warnings
+        warnings.warn("Background jobs need diskcache (pip install MMsuit[background]); running callbacks synchronously.")
+        return None, None
+    path = path or os.environ.get('MMSUIT_JOBS_CACHE') or cache_dir('jobs')
+    cache = diskcache.Cache(path)
+    return DiskcacheManager(cache, expire=3600), JobSlots(cache, jobs)
@@ -0,0 +1,126 @@
+#Dependencies
+
+#Load Packages
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+import io
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+
+def cache_dir(name: str) -> str:
+    '''
+    Private per-user directory for server state (mode 0700, under XDG_CACHE_HOME or ~/.cache), so other local users
+    can neither read the sessions nor plant files in place of them, as they could in a shared temp directory.
+
+    Inputs: name: sub-directory name
+    :return: directory path, created if needed
+    '''
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    path = os.path.join(base, 'mmsuit', name)
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    os.chmod(path, 0o700)
+    return path
+
+def _dumps(value) -> bytes:
+    # (substrate array, {curve name: velocity array}) as an .npz archive, never pickled
+    S, curves = value
+    arrays = [np.asarray(S)] + [np.asarray(v) for v in curves.values()]
+    if any(arr.dtype.hasobject for arr in arrays):
+        raise ValueError("Session data must be numeric arrays.")
+    buf = io.BytesIO()
+    np.savez(buf, *arrays, names=np.array(list(curves), dtype=str))
+    return buf.getvalue()
+
+def _loads(blob: bytes):
+    with np.load(io.BytesIO(blob), allow_pickle=False) as data:
+        names = [str(name) for name in data['names']]
+        return data['arr_0'], {name: data[f'arr_{i + 1}'] for i, name in enumerate(names)}
+
+class MemoryStore:
+    '''
+    In-process session store: an LRU of at most maxsize entries, each expiring ttl seconds after it was last written.
+    Only shared by the threads of one server process, use SQLiteStore when running several workers.
+    '''
+    def __init__(self, maxsize: int = 64, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+class SQLiteStore:
+    '''
+    Session store in a local SQLite file, shared by every worker process on the machine. Values are uploads,
+    (substrate array, {curve name: velocity array}), stored as .npz blobs and loaded without pickle. The default file
+    lives in a private per-user directory (see cache_dir). Entries expire ttl seconds after they were last written.
+    '''
+    def __init__(self, path: str = None, ttl: float = 3600):
+        self.path = path or os.path.join(cache_dir('sessions'), 'sessions.sqlite')
+        self.ttl = ttl
+        with self._connect() as con:
+            con.execute('PRAGMA journal_mode=WAL')
+            con.execute('CREATE TABLE IF NOT EXISTS sessions (key TEXT PRIMARY KEY, value BLOB, expires REAL)')
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps the store safe across threads and processes;
+        # the transaction is committed (or rolled back) and the connection closed on exit
+        with closing(sqlite3.connect(self.path, timeout=30)) as con, con:
+            yield con
+
+    def get(self, key, default=None):
+        with self._connect() as con:
+            row = con.execute('SELECT value FROM sessions WHERE key = ? AND expires >= ?', (key, time.time())).fetchone()
+        return default if row is None else _loads(row[0])
+
+    def set(self, key, value):
+        blob = _dumps(value)
+        now = time.time()
+        with self._connect() as con:
+            con.execute('DELETE FROM sessions WHERE expires < ?', (now,))
+            con.execute('INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)', (key, blob, now + self.ttl))
+
+    def delete(self, key):
+        with self._connect() as con:
+            con.execute('DELETE FROM sessions WHERE key = ?', (key,))
+
+def MMstore(backend: str = None, **kwargs):
+    '''
+    Builds the session store used by the GUI.
+
+    Inputs: backend: 'memory', 'sqlite' or 'sqlite:<path>'; defaults to the MMSUIT_STORE environment variable,
+    then 'memory'. Keyword arguments (maxsize, ttl) are passed to the store.
+    :return: MemoryStore or SQLiteStore
+    '''
+    backend = backend or os.environ.get('MMSUIT_STORE', 'memory')
+    if backend == 'memory':
+        return MemoryStore(**kwargs)
+    if backend == 'sqlite' or backend.startswith('sqlite:'):
+        path = backend.partition(':')[2] or None
+        return SQLiteStore(path, **kwargs)
+    raise ValueError(f"Unknown session store backend: {backend!r}")
@@ -1 +1,16 @@
-from MMsuit.MMapp import *
+# The GUI (Dash, Flask, pandas, Plotly) is only imported when it is used, so `import MMsuit` and
+# `import MMsuit.MMcalc` stay cheap for scripts, the CLI and worker processes.
+
+def MMgui(*args, **kwargs):
+    '''
+    Runs the MMsuit GUI, see MMsuit.MMapp.MMgui. The Dash app is imported and built on the first call.
+    '''
+    from MMsuit.MMapp import MMgui as _MMgui
+    return _MMgui(*args, **kwargs)
+
+def __getattr__(name):
+    # Keep `MMsuit.app` / `MMsuit.server` working without importing Dash up front
+    if name in ('app', 'server'):
+        import MMsuit.MMapp
+        return getattr(MMsuit.MMapp, name)
+    raise AttributeError(f"module 'MMsuit' has no attribute {name!r}")
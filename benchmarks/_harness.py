@@ -0,0 +1,115 @@
+'''
+Shared helpers for the MMsuit benchmarks: synthetic datasets, timing/peak-memory measurement, result reporting and
+Dash callback requests (also used by tests/test_MMapp.py, so the request format is defined once).
+Only NumPy and the standard library are used, so the benchmarks run offline anywhere the package runs.
+'''
+import argparse
+import base64
+import io
+import itertools
+import json
+import time
+import tracemalloc
+import numpy as np
+
+def make_curves(n_curves: int, n_points: int, noise: float = 0.0, nan_fraction: float = 0.0, seed: int = 0):
+    '''
+    Synthetic Michaelis-Menten curves with random Km and Vmax, relative Gaussian noise and randomly dropped (NaN) points.
+
+    Inputs: n_curves, n_points: dataset shape, noise: relative noise level, nan_fraction: fraction of NaN velocities
+    :return: substrate array (n_points,), velocity matrix (n_curves, n_points), true (Km, Vmax) (n_curves, 2)
+    '''
+    rng = np.random.default_rng(seed)
+    Km = rng.uniform(5, 60, n_curves)
+    Vmax = rng.uniform(1, 20, n_curves)
+    S = np.linspace(1, 10*Km.max(), n_points)
+    V = Vmax[:, None]*S/(Km[:, None] + S)
+    V *= 1 + noise*rng.standard_normal(V.shape)
+    if nan_fraction:
+        drop = rng.random(V.shape) < nan_fraction
+        drop[:, :3] = False  # Keep every curve fittable
+        V[drop] = np.nan
+    return S, V, np.column_stack([Km, Vmax])
+
+def grid(**axes):
+    '''
+    Cartesian product of benchmark parameters, e.g. grid(n_points=[10, 50], noise=[0, 0.05]) -> list of dicts.
+    '''
+    keys = list(axes)
+    return [dict(zip(keys, values)) for values in itertools.product(*axes.values())]
+
+def measure(func, repeat: int = 3) -> dict:
+    '''
+    Times func() repeat times (best run is reported) and measures its peak traced memory in a separate run,
+    so tracemalloc overhead does not inflate the timings.
+
+    Inputs: func: callable without arguments returning the number of failed items (or None), repeat: timed runs
+    :return: dict with best and median seconds, peak memory in MiB and failure count
+    '''
+    times = []
+    failed = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        failed = func() or 0
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'best_s': min(times), 'median_s': float(np.median(times)), 'peak_MiB': peak/2**20, 'failed': failed}
+
+def parser(description: str) -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description=description)
+    p.add_argument('--quick', action='store_true', help='small grid for smoke runs')
+    p.add_argument('--repeat', type=int, default=3, help='timed runs per case (best is reported)')
+    p.add_argument('--json', help='also write the results to this JSON file, e.g. to compare runs')
+    return p
+
+def report(results: list, json_path: str = None):
+    '''
+    Prints one line per benchmark case with throughput in curves/s and peak memory, optionally saving JSON.
+    '''
+    for r in results:
+        params = ' '.join(f'{k}={v}' for k, v in r['params'].items())
+        print(f"{r['name']:<28} {params:<52} {r['curves_per_s']:>12.1f} curves/s {r['best_s']*1e3:>10.2f} ms "
+              f"{r['peak_MiB']:>8.2f} MiB  failed={r['failed']}")
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(results, f, indent=1)
+
+def record(name: str, params: dict, n_curves: int, stats: dict) -> dict:
+    return {'name': name, 'params': params, 'curves_per_s': n_curves/stats['best_s'], **stats}
+
+def upload_contents(S, V) -> str:
+    '''
+    Wide CSV (substrate + one velocity column per curve, named V0, V1, ...) as a dcc.Upload data URL.
+
+    Inputs: S: substrate array (n_points,), V: velocities (n_points,) or (n_curves, n_points)
+    '''
+    V = np.atleast_2d(V)
+    buf = io.StringIO()
+    header = 'S,' + ','.join(f'V{i}' for i in range(len(V)))
+    np.savetxt(buf, np.column_stack([S, V.T]), delimiter=',', header=header, comments='')
+    return 'data:text/csv;base64,' + base64.b64encode(buf.getvalue().encode()).decode()
+
+def callback_body(outputs, inputs, state) -> dict:
+    '''
+    JSON body of one Dash callback request, as the renderer posts it to /_dash-update-component.
+
+    Inputs: outputs: [(id, property)], inputs, state: [(id, property, value)]; the first input is the trigger
+    '''
+    return {'output': '..' + '...'.join(f'{i}.{p}' for i, p in outputs) + '..',
+            'outputs': [{'id': i, 'property': p} for i, p in outputs],
+            'inputs': [{'id': i, 'property': p, 'value': v} for i, p, v in inputs],
+            'state': [{'id': i, 'property': p, 'value': v} for i, p, v in state],
+            'changedPropIds': [f'{inputs[0][0]}.{inputs[0][1]}']}
+
+def dispatch(client, outputs, inputs, state) -> dict:
+    '''
+    Runs one Dash callback through a Flask test client (full request/JSON round trip).
+    :return: the callback response, {id: {property: value}}
+    '''
+    response = client.post('/_dash-update-component', json=callback_body(outputs, inputs, state))
+    if response.status_code != 200:
+        raise RuntimeError(f'callback failed with HTTP {response.status_code}')
+    return response.get_json()['response']
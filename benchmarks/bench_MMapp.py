@@ -0,0 +1,64 @@
+'''
+Benchmarks of the Dash callbacks of MMapp, driven through the Flask test client (full request/JSON round trip, no
+browser or network): parsing an upload (update_upload) and fitting/plotting a selected curve (update_output) with
+a cold and a warm fit cache. Reports throughput (curves/s) and peak memory.
+
+Run from the repository root: python benchmarks/bench_MMapp.py [--quick] [--json results.json]
+'''
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import numpy as np
+import MMsuit.MMcalc as mm
+import MMsuit.MMapp as MMapp
+from _harness import make_curves, grid, measure, parser, report, record, upload_contents, dispatch
+
+SESSION = 'benchmark-session'
+
+def upload(client, contents):
+    return dispatch(client, [('upload-output', 'children'), ('curve-select', 'options'), ('curve-select', 'value')],
+                    [('upload-input', 'contents', contents)],
+                    [('upload-input', 'filename', 'benchmark.csv'), ('session-id', 'data', SESSION)])
+
+def select(client, curve):
+    return dispatch(client, [('MM-plot', 'figure'), ('LB-plot', 'figure'), ('vmax-box', 'value'), ('km-box', 'value'),
+                             ('fit-params', 'data')],
+                    [('curve-select', 'value', curve)], [('session-id', 'data', SESSION)])
+
+def main(argv=None):
+    args = parser(__doc__).parse_args(argv)
+    if args.quick:
+        cases = grid(n_points=[10, 50], n_curves=[4], noise=[0.05], nan_fraction=[0.0])
+    else:
+        cases = grid(n_points=[10, 50, 500], n_curves=[1, 24, 96], noise=[0.0, 0.05], nan_fraction=[0.0, 0.1])
+    client = MMapp.app.server.test_client()
+    client.get('/')
+    results = []
+    for params in cases:
+        S, V, _ = make_curves(params['n_curves'], params['n_points'], params['noise'], params['nan_fraction'])
+        n = params['n_curves']
+        contents = upload_contents(S, V)
+        curves = [f'V{i}' for i in range(n)]
+
+        def parse():
+            upload(client, contents)
+            return 0
+
+        def cold():
+            mm.MMfit.cache_clear()
+            failed = 0
+            for curve in curves:
+                failed += select(client, curve)['fit-params']['data'] is None
+            return failed
+
+        def warm():
+            return sum(select(client, curve)['fit-params']['data'] is None for curve in curves)
+
+        results.append(record('update_upload', params, n, measure(parse, args.repeat)))
+        results.append(record('update_output[cold cache]', params, n, measure(cold, args.repeat)))
+        results.append(record('update_output[warm cache]', params, n, measure(warm, args.repeat)))
+    report(results, args.json)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+'''
+Benchmarks of the MMcalc fitting and plotting functions on synthetic datasets over a grid of points per curve,
+curve counts, noise levels and NaN fractions. Reports throughput (curves/s) and peak memory.
+
+Run from the repository root: python benchmarks/bench_MMcalc.py [--quick] [--json results.json]
+'''
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import MMsuit.MMcalc as mm
+from _harness import make_curves, grid, measure, parser, report, record
+
+def scalar_loop(func, S, V):
+    # Runs func on every curve, counting curves where it raises
+    def run():
+        failed = 0
+        for row in V:
+            try:
+                func((S, row))
+            except Exception:
+                failed += 1
+        return failed
+    return run
+
+def each(func, items):
+    # Runs func on every item, for benchmarks that cannot fail per curve
+    def run():
+        for item in items:
+            func(item)
+        return 0
+    return run
+
+def main(argv=None):
+    args = parser(__doc__).parse_args(argv)
+    if args.quick:
+        cases = grid(n_points=[10, 50], n_curves=[8], noise=[0.05], nan_fraction=[0.0, 0.1])
+    else:
+        cases = grid(n_points=[10, 50, 500], n_curves=[1, 96, 384], noise=[0.0, 0.05], nan_fraction=[0.0, 0.1])
+    results = []
+    for params in cases:
+        S, V, _ = make_curves(params['n_curves'], params['n_points'], params['noise'], params['nan_fraction'])
+        n = params['n_curves']
+        fits = [mm.MMfit((S, row)) for row in V]
+        benches = {
+            'MMhandler': scalar_loop(mm.MMhandler, S, V),
+            'LBfitter': scalar_loop(mm.LBfitter, S, V),
+            'MMfitter[analytic]': scalar_loop(mm.MMfitter, S, V),
+            'MMfitter[minimize]': scalar_loop(lambda eSV: mm.MMfitter(eSV, method='minimize'), S, V),
+            'MMfitter_batch': lambda: int((~mm.MMfitter_batch(S, V)[2]).sum()),
+            'MMplot[prefit]': each(lambda fit: mm.MMplot(fit.eSV, fit), fits),
+            'LBplot[prefit]': each(lambda fit: mm.LBplot(fit.eSV, fit), fits),
+        }
+        for name, func in benches.items():
+            results.append(record(name, params, n, measure(func, args.repeat)))
+    report(results, args.json)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+'''
+Startup-time benchmark: times `import MMsuit.MMcalc` (and `import MMsuit`) in fresh interpreters and checks that
+only NumPy/SciPy are loaded, i.e. that Dash, Flask, pandas and Plotly stay lazy.
+
+Run from the repository root: python benchmarks/bench_startup.py [--repeat N]
+'''
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Repository root, put on the path of every probe so the benchmark runs from any directory without an install
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules that must not be imported by the numeric API
+HEAVY = ('dash', 'flask', 'pandas', 'plotly', 'scipy.stats')
+
+PROBE = '''
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+def time_import(module: str, repeat: int = 5) -> dict:
+    '''
+    Imports module in repeat fresh interpreters.
+
+    Inputs: module: dotted module name, repeat: number of interpreters
+    :return: dict with the median and minimum import time in seconds and the heavy modules that got loaded
+    '''
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY)],
+                             capture_output=True, text=True, check=True, cwd=ROOT, env=env)
+        runs.append(json.loads(out.stdout))
+    seconds = [run['seconds'] for run in runs]
+    return {'module': module, 'median_s': statistics.median(seconds), 'min_s': min(seconds), 'loaded': runs[0]['loaded']}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+    ok = True
+    for module in ('MMsuit', 'MMsuit.MMcalc'):
+        result = time_import(module, args.repeat)
+        print(f"{result['module']:<16} median {result['median_s']*1e3:8.1f} ms   min {result['min_s']*1e3:8.1f} ms   "
+              f"heavy modules loaded: {', '.join(result['loaded']) or 'none'}")
+        ok &= not result['loaded']
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
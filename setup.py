@@ -17,6 +17,9 @@ setup(
         "plotly",
 
     ],
+    extras_require={
+        "background": ["dash[diskcache]"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -26,6 +29,7 @@ setup(
     entry_points={
         "console_scripts": [
             "MMsuit=MMsuit:MMsuit",
+            "mmsuit-fit=MMsuit.MMcli:main",
         ],
     }
 )
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import pytest
+import numpy as np
+from MMsuit.MMcalc import MMvelocity
+
+MMapp = pytest.importorskip('MMsuit.MMapp')
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+from _harness import callback_body, dispatch, upload_contents
+
+def test_sessions_are_isolated():
+    client = MMapp.app.server.test_client()
+    S = np.linspace(1, 80, 20)
+    uploads = {'session-a': (40, 10), 'session-b': (20, 5)}
+    # Both users upload before either selects a curve
+    for session_id, (Km, Vmax) in uploads.items():
+        response = dispatch(client, [('upload-output', 'children'), ('curve-select', 'options'), ('curve-select', 'value')],
+                            [('upload-input', 'contents', upload_contents(S, MMvelocity(S, Km, Vmax)))],
+                            [('upload-input', 'filename', f'{session_id}.csv'), ('session-id', 'data', session_id)])
+        assert response['curve-select']['value'] == 'V0'
+    for session_id, (Km, Vmax) in uploads.items():
+        response = dispatch(client, [('MM-plot', 'figure'), ('LB-plot', 'figure'), ('vmax-box', 'value'),
+                                     ('km-box', 'value'), ('fit-params', 'data')],
+                            [('curve-select', 'value', 'V0')], [('session-id', 'data', session_id)])
+        assert float(response['km-box']['value']) == pytest.approx(Km, abs=0.01)
+        assert float(response['vmax-box']['value']) == pytest.approx(Vmax, abs=0.01)
+
+@pytest.fixture
+def background_app(tmp_path, monkeypatch):
+    # MMapp configured for background jobs, restored to the default synchronous app afterwards
+    pytest.importorskip('diskcache')
+    import importlib
+    monkeypatch.setenv('MMSUIT_JOBS', '1')
+    monkeypatch.setenv('MMSUIT_JOBS_CACHE', str(tmp_path / 'jobs'))
+    monkeypatch.setenv('MMSUIT_STORE', f'sqlite:{tmp_path / "sessions.sqlite"}')
+    yield importlib.reload(MMapp)
+    monkeypatch.undo()
+    importlib.reload(MMapp)
+
+def test_initial_render_starts_no_job(background_app):
+    client = background_app.app.server.test_client()
+    # The renderer skips callbacks marked prevent_initial_call on page load
+    dependencies = client.get('/_dash-dependencies').get_json()
+    fit = [d for d in dependencies if d['output'].startswith(('..fit-request.data', '..MM-plot.figure'))]
+    assert len(fit) == 2 and all(d['prevent_initial_call'] for d in fit)
+    # An empty curve selection is not admitted and starts nothing
+    response = client.post('/_dash-update-component',
+                           json=callback_body([('fit-request', 'data'), ('fit-status', 'children')],
+                                              [('curve-select', 'value', None)], [('session-id', 'data', 'session-a')]))
+    assert response.status_code == 204
+    assert background_app.job_slots.pending() == 0
+
+def test_profile_logs():
+    # MMSUIT_PROFILE=1 alone makes the records visible, without any logging setup by the caller
+    code = ("import numpy as np; import MMsuit.MMapp as app\n"
+            "with app._profiled(): app.mm.MMfit((np.arange(1., 9), np.arange(1., 9)/(4 + np.arange(1., 9))))")
+    env = dict(os.environ, MMSUIT_PROFILE='1', PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, check=True)
+    assert 'MMfit' in out.stderr
@@ -0,0 +1,47 @@
+import pytest
+import numpy as np
+from MMsuit.MMcalc import MMvelocity, MMfitter_batch, MMfitter, MMhandler
+from MMsuit.MMarchive import MMarchive, MMrecords, RESULT_DTYPE
+
+@pytest.fixture
+def batch_fit():
+    S = np.linspace(1, 80, 20)
+    V = np.vstack([MMvelocity(S, Km, 10) for Km in (10, 20, 40)])
+    return MMfitter_batch(S, V)
+
+def test_MMrecords(batch_fit):
+    popt, pcov, success, SSR = batch_fit
+    records = MMrecords(popt, pcov, success, SSR, source=7, n=20)
+    assert records.dtype == RESULT_DTYPE and len(records) == 3
+    assert np.allclose(records['Km'], [10, 20, 40], rtol=1e-4)
+    assert list(records['curve']) == [0, 1, 2] and np.all(records['source'] == 7) and records['success'].all()
+    assert np.allclose(records['cov_KmVmax'], pcov[:, 0, 1])
+    # A single MMfitter result gives one record
+    eSV = MMhandler((np.linspace(1, 80, 20), MMvelocity(np.linspace(1, 80, 20), 40, 10)))
+    fittedSV, popt, pcov, success, SSR = MMfitter(eSV)
+    single = MMrecords(popt, pcov, success, SSR)
+    assert len(single) == 1 and abs(single['Vmax'][0] - 10) < 0.01
+
+def test_MMarchive(batch_fit, tmp_path):
+    archive = MMarchive(capacity=2)
+    for source in range(5):
+        archive.append_fits(*batch_fit, source=source)
+    assert len(archive) == 15 and archive[3]['source'] == 1
+    assert len(archive.select(source=[0, 4])) == 6
+    assert np.allclose(archive.select(Km=(15, 25), chunksize=4)['Km'], 20, rtol=1e-4)
+    assert len(archive.select(success=False)) == 0
+    with pytest.raises(ValueError):
+        archive.select(kcat=(0, 1))
+
+    path = tmp_path / 'fits.npy'
+    archive.save(path)
+    loaded = MMarchive.load(path)
+    assert isinstance(loaded.records, np.memmap)
+    assert np.array_equal(loaded.records, archive.records)
+    assert len(loaded.select(source=2)) == 3
+    # Appending to a read-only memory map moves the archive into memory
+    loaded.append_fits(*batch_fit, source=5)
+    assert len(loaded) == 18 and not isinstance(loaded.records, np.memmap)
+    np.save(tmp_path / 'other.npy', np.arange(3))
+    with pytest.raises(ValueError):
+        MMarchive.load(tmp_path / 'other.npy')
@@ -79,6 +79,18 @@ def test_LBplot(syndata):
     assert trace['mode'] == 'lines'
     assert trace['name'] == 'Fitted'
 
+def test_plot_decimation():
+    S = np.linspace(1, 200, 50000)
+    V = MMvelocity(S, 40, 10)
+    V[123] = 50  # A spike must survive decimation
+    for plot in (MMplot, LBplot):
+        fig = plot((S, V), max_points=1000)
+        assert [type(trace).__name__ for trace in fig.data] == ['Scattergl', 'Scattergl']
+        assert len(fig.data[0].x) <= 1000 and len(fig.data[1].x) == PLOT_CURVE_POINTS
+    assert 50 in MMplot((S, V), max_points=1000).data[0].y
+    fig = MMplot((S, V), max_points=None, webgl_threshold=None)
+    assert type(fig.data[0]).__name__ == 'Scatter' and len(fig.data[0].x) == len(S)
+
 def test_MMsimulator():
     simulated = MMsimulator(40,10)
     assert len(simulated) == 2
@@ -86,3 +98,191 @@ def test_MMsimulator():
     assert trace['mode'] == 'lines'
     trace = simulated[1].data[0]
     assert trace['mode'] == 'lines'
+
+def test_MMfitter_batch(syndata):
+    S, V = syndata
+    popt, pcov, success, SSR = MMfitter_batch(np.vstack([S, S]), np.vstack([V, 2*V]))
+    assert popt.shape == (2, 2) and pcov.shape == (2, 2, 2)
+    assert np.all(success)
+    assert 39.9 <= popt[0][0] <= 40.1 and 9.9 <= popt[0][1] <= 10.1
+    assert 39.9 <= popt[1][0] <= 40.1 and 19.9 <= popt[1][1] <= 20.1
+    assert np.allclose(popt[0], MMfitter(syndata)[1], rtol=1e-3)
+    assert round(SSR[0], 2) == 0
+
+def test_MMfitter_batch_mask(nan_data):
+    S, V = nan_data
+    # Shared substrate row, NaNs and masked points are ignored
+    mask = np.ones((2, len(V)), dtype=bool)
+    mask[1, 10:20] = False
+    popt, pcov, success, SSR = MMfitter_batch(S, np.vstack([V, V]), mask=mask)
+    assert np.all(success)
+    assert np.all((39.9 <= popt[:, 0]) & (popt[:, 0] <= 40.1))
+    assert np.all((9.9 <= popt[:, 1]) & (popt[:, 1] <= 10.1))
+    with pytest.raises(ValueError):
+        MMfitter_batch(np.array(['a', 'b']), np.array([1.0, 2.0]))
+
+def test_MMjacobian():
+    J = MMjacobian(np.array([1.0, 10.0]), 10, 5)
+    assert J.shape == (2, 2)
+    # Central differences on Km and Vmax
+    h = 1e-6
+    assert np.allclose(J[:, 0], (MMvelocity(np.array([1.0, 10.0]), 10 + h, 5) - MMvelocity(np.array([1.0, 10.0]), 10 - h, 5))/(2*h))
+    assert np.allclose(J[:, 1], (MMvelocity(np.array([1.0, 10.0]), 10, 5 + h) - MMvelocity(np.array([1.0, 10.0]), 10, 5 - h))/(2*h))
+
+def test_MMfitter_methods(syndata):
+    S, V = syndata
+    noisy = (S, V*(1 + 0.05*np.sin(np.arange(len(V)))))
+    analytic = MMfitter(noisy)
+    legacy = MMfitter(noisy, method='minimize')
+    assert np.allclose(analytic[1], legacy[1], rtol=1e-4)
+    assert np.allclose(analytic[2], legacy[2], rtol=1e-3)
+    assert np.isclose(analytic[4], legacy[4], rtol=1e-6)
+    with pytest.raises(ValueError):
+        MMfitter(syndata, method='bogus')
+
+def test_MMfit_cache(syndata):
+    MMfit.cache_clear()
+    fit = MMfit(syndata)
+    assert 39.9 <= fit.Km <= 40.1 and 9.9 <= fit.Vmax <= 10.1
+    assert np.allclose(fit.LB[1], LBfitter(syndata)[1])
+    # Same content, different array objects: served from the cache
+    assert MMfit((syndata[0].copy(), syndata[1].copy())) is fit
+    assert MMfit.cache_info()['hits'] == 1
+    assert not fit.MM[1].flags.writeable
+    assert MMfit(syndata, method='minimize') is not fit
+    # The public key follows the content and the options
+    assert MMfit.key((syndata[0].copy(), syndata[1].copy())) == MMfit.key(syndata) != MMfit.key(syndata, method='minimize')
+    # Least recently used entries are evicted
+    MMfit.cache_resize(1)
+    assert MMfit.cache_info()['currsize'] == 1
+    assert MMfit(syndata) is not fit
+    MMfit.cache_resize(128)
+    assert len(MMplot(syndata, fit).data) == 2
+    assert len(LBplot(syndata, fit).data) == 2
+
+def test_MMbootstrap(syndata):
+    S, V = syndata
+    noisy = (S, V*(1 + 0.05*np.sin(np.arange(len(V)))))
+    ci, se, samples = MMbootstrap(noisy, n_boot=500, seed=0)
+    assert samples.shape == (500, 2) and ci.shape == (2, 2)
+    Km, Vmax = MMfitter(noisy)[1]
+    assert ci[0][0] < Km < ci[0][1] and ci[1][0] < Vmax < ci[1][1]
+    assert np.all(se > 0)
+    # Seeded resamples are reproducible and do not depend on the worker count
+    assert np.allclose(MMbootstrap(noisy, n_boot=500, seed=0, workers=2)[0], ci)
+    assert MMbootstrap(noisy, n_boot=200, mode='pairs', seed=1)[2].shape == (200, 2)
+    with pytest.raises(ValueError):
+        MMbootstrap(noisy, mode='bogus')
+
+def test_MMprofile(syndata):
+    seen = []
+    with MMprofile(callback=seen.append) as prof:
+        MMfitter(syndata)
+        MMfitter(syndata, method='minimize')
+        MMfitter_batch(*syndata)
+    stages = prof.summary()
+    for stage in ('MMhandler', 'MMfitter.least_squares', 'MMfitter.minimize', 'MMfitter.curve_fit',
+                  'LBfitter.zscore', 'LBfitter.minimize', 'MMfitter_batch'):
+        assert stages[stage]['count'] >= 1
+    assert seen == prof.events
+    assert all(event['seconds'] >= 0 for event in prof.events)
+    assert next(e for e in prof.events if e['stage'] == 'MMfitter.minimize')['nfev'] > 0
+    # Nothing is recorded outside the context manager
+    MMfitter(syndata)
+    assert len(prof.events) == len(seen)
+    assert MMprofile.start() is None
+
+def test_MMonline(syndata):
+    S, V = syndata
+    fitter = MMonline(capacity=4)
+    assert np.isnan(fitter.Km)
+    for s, v in zip(S, V):
+        fitter.append(s, v)
+    fitter.append(np.nan, 1.0)  # Ignored
+    assert fitter.n == len(S)
+    assert 39.9 <= fitter.Km <= 40.1 and 9.9 <= fitter.Vmax <= 10.1
+    assert np.allclose(fitter.popt, MMfitter(syndata)[1], rtol=1e-4)
+    assert fitter.pcov.shape == (2, 2)
+    Km, Vmax = fitter.LBestimate()
+    assert 39.9 <= Km <= 40.1 and 9.9 <= Vmax <= 10.1
+    # Appending several points at once gives the same data
+    batch = MMonline()
+    batch.append(S, V)
+    assert np.allclose(batch.eSV[0], fitter.eSV[0])
+    assert np.allclose(fitter.fit()[1], fitter.popt, rtol=1e-4)
+    # Refinements are spaced geometrically; growth=1 refines on every append
+    every = MMonline(growth=1)
+    for s, v in zip(S, V):
+        every.append(s, v)
+    assert np.allclose(every.popt, fitter.popt, rtol=1e-4)
+    with pytest.raises(ValueError):
+        MMonline(growth=0.5)
+
+@pytest.fixture
+def outlier_data(syndata):
+    # syndata with three gross outliers, one of them at low substrate where 1/V is most sensitive
+    S, V = syndata
+    V = V.copy()
+    V[[1, 20, 40]] *= [3, 0.4, 1.8]
+    return (S, V)
+
+@pytest.mark.parametrize('robust', ['huber', 'soft_l1', 'ransac'])
+def test_robust(syndata, outlier_data, robust):
+    assert not 39 <= MMfitter(outlier_data)[1][0] <= 41
+    fittedSV, popt, pcov, success, SSR = MMfitter(outlier_data, robust=robust)
+    assert success and 39 <= popt[0] <= 41 and 9.9 <= popt[1] <= 10.1
+    LB = LBfitter(outlier_data, robust=robust)
+    assert 39 <= LB[1] <= 41 and 9.9 <= LB[2] <= 10.1
+    # The batched path solves the same problem for every row
+    S, V = outlier_data
+    popt_b, pcov_b, success_b, SSR_b = MMfitter_batch(S, np.vstack([V, syndata[1]]), robust=robust, seed=0)
+    assert success_b.all()
+    assert np.allclose(popt_b[0], popt, rtol=1e-3) and np.allclose(popt_b[1], [40, 10], rtol=1e-2)
+    with pytest.raises(ValueError):
+        MMfitter(outlier_data, method='minimize', robust=robust)
+
+def test_robust_invalid(syndata):
+    for fitter in (MMfitter, LBfitter):
+        with pytest.raises(ValueError):
+            fitter(syndata, robust='tukey')
+    with pytest.raises(ValueError):
+        MMfitter_batch(*syndata, robust='tukey')
+
+def test_MMfitter_few_points(syndata):
+    S, V = syndata
+    for n in (1, 2):
+        assert not MMfitter((S[:n], V[:n]))[3]
+    assert MMfitter((S[:3], V[:3]))[3]
+
+def test_MMfitter_batch_degenerate(syndata):
+    # Rows with fewer than two points, empty input and negative velocities never report an out-of-bounds success
+    popt, pcov, success, SSR = MMfitter_batch(np.ones((3, 1)), np.ones((3, 1)))
+    assert not success.any() and np.isnan(popt).all() and np.isnan(SSR).all()
+    popt, pcov, success, SSR = MMfitter_batch(np.ones((2, 0)), np.ones((2, 0)))
+    assert popt.shape == (2, 2) and not success.any()
+    popt, pcov, success, SSR = MMfitter_batch(syndata[0], -syndata[1])
+    assert np.all(popt[success] > 0)
+
+def test_ransac_reproducible(outlier_data):
+    assert not MMfitter_batch(np.ones((2, 1)), np.ones((2, 1)), robust='ransac')[2].any()
+    first = MMfitter(outlier_data, robust='ransac', seed=1, n_trials=8)[1]
+    assert np.array_equal(first, MMfitter(outlier_data, robust='ransac', seed=1, n_trials=8)[1])
+    assert np.array_equal(LBfitter(outlier_data, robust='ransac', seed=1)[1], LBfitter(outlier_data, robust='ransac', seed=1)[1])
+    # MMfit keys the cache on the RANSAC options and derives the seed from the data when none is given
+    MMfit.cache_clear()
+    fit = MMfit(outlier_data, robust='ransac')
+    assert np.array_equal(fit.MM[1], MMfit(outlier_data, robust='ransac').MM[1])
+    assert MMfit(outlier_data, robust='ransac', seed=1) is not fit
+
+def test_LBfitter_robust_stderr(outlier_data):
+    # Standard errors come from the weighted problem, so rejected outliers do not inflate them
+    S, V = outlier_data
+    rng = np.random.default_rng(0)
+    V = V*(1 + 0.01*rng.standard_normal(len(V)))
+    clean = LBfitter((np.delete(S, [1, 20, 40]), np.delete(V, [1, 20, 40])))
+    ransac = LBfitter((S, V), robust='ransac', seed=0)
+    assert ransac[3] == pytest.approx(clean[3], rel=0.1)
+    assert ransac[4] == pytest.approx([ransac[2] - 1.96*ransac[3], ransac[2] + 1.96*ransac[3]])
+    for robust in ('huber', 'soft_l1'):
+        # Outliers are only downweighted here, so they still add a little (0.23 when computed unweighted)
+        assert LBfitter((S, V), robust=robust)[3] < 0.1
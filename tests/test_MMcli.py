@@ -0,0 +1,57 @@
+import csv
+import pytest
+import numpy as np
+from MMsuit.MMcalc import MMvelocity
+from MMsuit.MMcli import main, fit_paths, FIELDS
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    S = np.linspace(1, 80, 20)
+    # A single two-column curve and a plate export with three velocity columns
+    np.savetxt(tmp_path / 'single.csv', np.column_stack([S, MMvelocity(S, 40, 10)]), delimiter=',',
+               header='S,V', comments='')
+    plate = np.column_stack([S, MMvelocity(S, 40, 10), MMvelocity(S, 20, 5), np.full_like(S, np.nan)])
+    np.savetxt(tmp_path / 'plate.csv', plate, delimiter=',', header='S,A1,A2,A3', comments='')
+    (tmp_path / 'notes.txt').write_text('ignored')
+    return tmp_path
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+@pytest.mark.parametrize('method', ['analytic', 'batch'])
+def test_fit_paths(csv_dir, tmp_path, method):
+    out = tmp_path / 'fits.csv'
+    assert fit_paths([str(csv_dir)], str(out), workers=1, method=method) == 4
+    rows = read_rows(out)
+    assert list(rows[0].keys()) == FIELDS
+    assert [row['curve'] for row in rows] == ['A1', 'A2', 'A3', 'V']
+    assert 39.9 <= float(rows[0]['Km']) <= 40.1 and 9.9 <= float(rows[0]['Vmax']) <= 10.1
+    assert 19.9 <= float(rows[1]['Km']) <= 20.1 and 4.9 <= float(rows[1]['Vmax']) <= 5.1
+    assert rows[2]['success'] == 'False'
+    assert rows[3]['success'] == 'True'
+
+def test_main_process_pool(csv_dir, tmp_path):
+    out = tmp_path / 'fits.csv'
+    assert main([str(csv_dir / 'plate.csv'), str(csv_dir / 'single.csv'), '-o', str(out), '-j', '2', '--chunksize', '1']) == 0
+    rows = read_rows(out)
+    assert [row['source'] for row in rows] == [str(csv_dir / 'plate.csv')]*3 + [str(csv_dir / 'single.csv')]
+
+def test_main_robust(csv_dir, tmp_path):
+    out = tmp_path / 'fits.csv'
+    assert main([str(csv_dir), '-o', str(out), '-j', '1', '--method', 'batch', '--robust', 'huber']) == 0
+    rows = read_rows(out)
+    assert 39.9 <= float(rows[0]['Km']) <= 40.1
+    with pytest.raises(SystemExit):
+        main([str(csv_dir), '-o', str(out), '--method', 'minimize', '--robust', 'ransac'])
+
+@pytest.mark.parametrize('extra', [[], ['--robust', 'ransac']])
+def test_main_batch_bad_files(csv_dir, tmp_path, extra):
+    # Empty and one-row exports become failed rows instead of stopping the run
+    (csv_dir / 'empty.csv').write_text('S,V\n')
+    (csv_dir / 'one.csv').write_text('S,V\n1.0,0.5\n')
+    out = tmp_path / 'fits.csv'
+    assert main([str(csv_dir), '-o', str(out), '-j', '1', '--method', 'batch'] + extra) == 0
+    rows = {row['source'].rsplit('/', 1)[-1]: row for row in read_rows(out)}
+    assert rows['empty.csv']['success'] == 'False' and rows['one.csv']['success'] == 'False'
+    assert rows['single.csv']['success'] == 'True'
@@ -0,0 +1,52 @@
+import pytest
+import numpy as np
+from MMsuit.MMglobal import MMglobalfitter, MMFtest, MMinhibited, MODELS
+
+@pytest.fixture
+def competitive_series():
+    # Km = 40, Vmax = 10, Ki = 8, two replicates per inhibitor concentration with deterministic noise
+    S = np.linspace(2, 200, 15)
+    series = []
+    for k, I in enumerate([0, 5, 10, 20, 40]):
+        for rep in range(2):
+            V = MMinhibited(S, I, 40, 10, Ki=8)*(1 + 0.02*np.sin(np.arange(15) + 3*k + rep))
+            series.append((S, V, I))
+    return series
+
+def test_MMinhibited():
+    S = np.array([1.0, 10.0])
+    assert np.allclose(MMinhibited(S, 0, 10, 5), 5*S/(10 + S))
+    assert np.allclose(MMinhibited(S, 4, 10, 5, Ki=4), 5*S/(20 + S))
+    assert np.allclose(MMinhibited(S, 4, 10, 5, Kii=4), 5*S/(10 + 2*S))
+
+def test_MMglobalfitter(competitive_series):
+    fit = MMglobalfitter(competitive_series, 'competitive')
+    assert fit.success
+    assert 38 <= fit.params['Km'] <= 42 and 9.8 <= fit.params['Vmax'] <= 10.2 and 7.5 <= fit.params['Ki'] <= 8.5
+    assert fit.labels == ['Km', 'Vmax', 'Ki'] and fit.pcov.shape == (3, 3)
+    assert all(se > 0 for se in fit.se.values())
+    # The true model wins on information criteria
+    for model in ('MM', 'uncompetitive'):
+        assert MMglobalfitter(competitive_series, model).AIC > fit.AIC
+
+def test_MMglobalfitter_local(competitive_series):
+    fit = MMglobalfitter(competitive_series, 'competitive', local=('Vmax',))
+    assert len(fit.params['Vmax']) == len(competitive_series) and len(fit.popt) == 2 + len(competitive_series)
+    assert np.all(np.abs(fit.params['Vmax'] - 10) < 0.5)
+    with pytest.raises(ValueError):
+        MMglobalfitter(competitive_series, 'competitive', local=('Kii',))
+    with pytest.raises(ValueError):
+        MMglobalfitter([(s, v) for s, v, _ in competitive_series], 'mixed')
+    with pytest.raises(ValueError):
+        MMglobalfitter(competitive_series, 'bogus')
+
+def test_MMFtest(competitive_series):
+    simple = MMglobalfitter(competitive_series, 'MM')
+    competitive = MMglobalfitter(competitive_series, 'competitive')
+    mixed = MMglobalfitter(competitive_series, 'mixed')
+    F, p = MMFtest(simple, competitive)
+    assert F > 0 and p < 1e-6
+    assert MMFtest(competitive, mixed)[1] > 0.05
+    with pytest.raises(ValueError):
+        MMFtest(competitive, simple)
+    assert set(MODELS) == {'MM', 'competitive', 'uncompetitive', 'mixed'}
@@ -0,0 +1,34 @@
+import base64
+import io
+import pytest
+import numpy as np
+from MMsuit.MMio import MMdecode, MMread
+
+@pytest.fixture
+def wide_csv():
+    return b'S,A1,A2\n1,0.5,0.25\n2,0.8,\n4,1.0,0.6\n'
+
+def test_MMdecode(wide_csv):
+    assert MMdecode('data:text/csv;base64,' + base64.b64encode(wide_csv).decode()) == wide_csv
+    with pytest.raises(ValueError):
+        MMdecode('not a data url')
+
+def test_MMread_csv(wide_csv, tmp_path):
+    S, curves = MMread(wide_csv, 'plate.csv')
+    assert list(curves) == ['A1', 'A2']
+    assert S.dtype == np.float64 and np.allclose(S, [1, 2, 4])
+    assert np.isnan(curves['A2'][1])
+    path = tmp_path / 'plate.csv'
+    path.write_bytes(wide_csv)
+    assert np.allclose(MMread(str(path))[1]['A1'], curves['A1'])
+    with pytest.raises(ValueError):
+        MMread(b'S\n1\n2\n', 'single.csv')
+    with pytest.raises(ValueError):
+        MMread(b'S,V\n1,bad\n', 'bad.csv')
+
+def test_MMread_npy():
+    buf = io.BytesIO()
+    np.save(buf, np.array([[1.0, 0.5, 0.2], [2.0, 0.8, 0.3]]))
+    S, curves = MMread(buf.getvalue(), 'plate.npy')
+    assert list(curves) == ['V1', 'V2']
+    assert np.allclose(curves['V2'], [0.2, 0.3])
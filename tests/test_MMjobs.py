@@ -0,0 +1,64 @@
+import subprocess
+import sys
+import threading
+import pytest
+from MMsuit.MMjobs import JobSlots, MMjobs
+
+diskcache = pytest.importorskip('diskcache')
+
+@pytest.fixture
+def cache(tmp_path):
+    with diskcache.Cache(str(tmp_path / 'jobs')) as cache:
+        yield cache
+
+def test_JobSlots(cache):
+    slots = JobSlots(cache, 2, poll=0.01)
+    with slots.acquire():
+        with slots.acquire():
+            assert slots.busy() == 2
+            # A third job waits until a slot is released
+            waited, done = threading.Event(), threading.Event()
+            def job():
+                with slots.acquire(on_wait=waited.set):
+                    done.set()
+            thread = threading.Thread(target=job)
+            thread.start()
+            assert waited.wait(5) and not done.is_set()
+        thread.join(5)
+        assert done.is_set()
+    assert slots.busy() == 0
+    with pytest.raises(ValueError):
+        JobSlots(cache, 0)
+
+def test_JobSlots_reclaim(cache):
+    # A slot left behind by a killed job is freed for the next one
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    cache.set('mmsuit-job-0', dead.pid)
+    slots = JobSlots(cache, 1, poll=0.01)
+    assert slots.busy() == 0
+    with slots.acquire(on_wait=pytest.fail):
+        assert slots.busy() == 1
+
+def test_MMjobs(tmp_path, monkeypatch):
+    monkeypatch.delenv('MMSUIT_JOBS', raising=False)
+    assert MMjobs() == (None, None)
+    manager, slots = MMjobs(3, str(tmp_path / 'jobs'))
+    assert manager is not None and slots.size == 3
+
+def test_JobSlots_admit(cache):
+    # Running and waiting jobs both count towards the admission limit
+    slots = JobSlots(cache, 1, poll=0.01)
+    assert slots.pending() == 0 and slots.admit(0)
+    with slots.acquire():
+        assert slots.pending() == 1 and not slots.admit(0) and slots.admit(1)
+        waited, done = threading.Event(), threading.Event()
+        def job():
+            with slots.acquire(on_wait=waited.set):
+                done.set()
+        thread = threading.Thread(target=job)
+        thread.start()
+        assert waited.wait(5)
+        assert slots.pending() == 2 and not slots.admit(1)
+    thread.join(5)
+    assert done.is_set() and slots.pending() == 0
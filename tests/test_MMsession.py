@@ -0,0 +1,67 @@
+import time
+import pytest
+import numpy as np
+import os
+import stat
+from MMsuit.MMsession import MMstore, MemoryStore, SQLiteStore
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MMstore('memory', ttl=0.2)
+    return MMstore(f'sqlite:{tmp_path / "sessions.sqlite"}', ttl=0.2)
+
+def test_store_roundtrip(store):
+    data = (np.arange(3.0), {'A1': np.ones(3)})
+    store.set('session-a', data)
+    assert store.get('session-b') is None
+    S, curves = store.get('session-a')
+    assert np.allclose(S, data[0]) and list(curves) == ['A1']
+    store.delete('session-a')
+    assert store.get('session-a', 'missing') == 'missing'
+
+def test_store_ttl(store):
+    store.set('session-a', (np.arange(3.0), {}))
+    time.sleep(0.3)
+    assert store.get('session-a') is None
+
+def test_memory_store_lru():
+    store = MemoryStore(maxsize=2)
+    store.set('a', 1)
+    store.set('b', 2)
+    store.get('a')
+    store.set('c', 3)
+    assert store.get('b') is None and store.get('a') == 1 and store.get('c') == 3
+
+def test_MMstore_backends(tmp_path, monkeypatch):
+    monkeypatch.setenv('MMSUIT_STORE', f'sqlite:{tmp_path / "env.sqlite"}')
+    assert isinstance(MMstore(), SQLiteStore)
+    assert isinstance(MMstore('memory'), MemoryStore)
+    with pytest.raises(ValueError):
+        MMstore('redis')
+
+def test_sqlite_store_private(tmp_path, monkeypatch):
+    # The default file lives in a per-user 0700 directory and blobs are loaded without pickle
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    store = SQLiteStore()
+    assert stat.S_IMODE(os.stat(os.path.dirname(store.path)).st_mode) == 0o700
+    store.set('a', (np.arange(3.0), {'A1': np.ones(3), 'A2': np.zeros(3)}))
+    S, curves = store.get('a')
+    assert list(curves) == ['A1', 'A2'] and np.allclose(curves['A2'], 0)
+    with pytest.raises(ValueError):
+        store.set('b', (np.array([object()]), {}))
+
+def test_sqlite_store_closes(tmp_path, monkeypatch):
+    # Every call closes its connection instead of leaving it to the garbage collector
+    import sqlite3
+    opened = []
+    connect = sqlite3.connect
+    monkeypatch.setattr(sqlite3, 'connect', lambda *args, **kwargs: opened.append(connect(*args, **kwargs)) or opened[-1])
+    store = SQLiteStore(str(tmp_path / 'sessions.sqlite'))
+    store.set('a', (np.arange(3.0), {'A': np.ones(3)}))
+    assert store.get('a') is not None
+    store.delete('a')
+    assert len(opened) == 4
+    for con in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            con.execute('SELECT 1')
@@ -0,0 +1,13 @@
+import subprocess
+import sys
+
+def test_MMcalc_import_is_lazy():
+    # Importing the package and the numeric API must not pull in the GUI or plotting stack
+    code = ('import sys, MMsuit, MMsuit.MMcalc; '
+            'print(",".join(m for m in ("dash", "flask", "pandas", "plotly", "scipy.stats") if m in sys.modules))')
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ''
+
+def test_MMgui_is_exposed():
+    import MMsuit
+    assert callable(MMsuit.MMgui)